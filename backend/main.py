@@ -1,18 +1,56 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import anyio.to_thread
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from routes.extract import router as extract_router
+from routes.extract import UploadSizeLimitMiddleware, router as extract_router
 from routes.fit import router as fit_router
+from services.executor import shutdown_process_pool
 
 load_dotenv()
 
-app = FastAPI(title="GraphFit API", version="1.0.0")
+
+class NumpyORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with NumPy scalars/arrays serialized natively."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync endpoints (the fitters) run on AnyIO's threadpool, capped at 40
+    # threads by default. Size it to the machine instead; THREADPOOL_SIZE
+    # overrides.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = (
+        int(os.getenv("THREADPOOL_SIZE", "0")) or min(64, (os.cpu_count() or 1) * 4)
+    )
+    yield
+    # The fitting process pool is created lazily; stop its workers on exit
+    shutdown_process_pool()
+
+
+app = FastAPI(
+    title="GraphFit API",
+    version="1.0.0",
+    default_response_class=NumpyORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Cap image upload bodies while they stream in, before FastAPI parses them.
+# Added first so the middleware added after it (CORS) wraps its early 413
+# and the browser can read the error.
+app.add_middleware(UploadSizeLimitMiddleware)
 
 # CORS — allow localhost in dev; in production the frontend is served from the same origin
 allowed_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
@@ -25,6 +63,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Fit responses carry a base64 graph plus the echoed points — compress them
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ── API routes ───────────────────────────────────────────────────────
 app.include_router(extract_router, prefix="/api")
 app.include_router(fit_router, prefix="/api")
@@ -39,28 +80,35 @@ def health():
 # The build script places the Vite build output in  backend/static/
 STATIC_DIR = Path(__file__).parent / "static"
 
+
+class SPAStaticFiles(StaticFiles):
+    """
+    Static files for the Vite build, with SPA fallback and cache headers.
+
+    Unknown paths outside /api and /assets fall back to index.html so
+    client-side routes (/upload, /review, ...) load. Vite's /assets/* filenames are content-hashed,
+    so they are cached forever; everything else is revalidated on each load.
+    """
+
+    async def get_response(self, path: str, scope):
+        try:
+            response = await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            # A missing hashed asset stays 404: serving index.html in its
+            # place would get cached for a year as the JS/CSS bundle
+            if exc.status_code != 404 or path.startswith(("api", "assets/")):
+                raise
+            response = await super().get_response("index.html", scope)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        if path.startswith("assets/"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
 if STATIC_DIR.is_dir():
-    # Serve /assets (JS, CSS, images produced by Vite)
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
-
-    # Serve other static files at root (e.g. vite.svg, favicon)
-    @app.get("/vite.svg")
-    async def vite_svg():
-        return FileResponse(STATIC_DIR / "vite.svg")
-
-    # Serve static files (favicon, etc.) at the root level
-    @app.get("/", include_in_schema=False)
-    async def serve_index():
-        return FileResponse(STATIC_DIR / "index.html")
-
-    # SPA fallback: serve index.html for all non-API GET routes
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def serve_spa(full_path: str):
-        # Don't intercept /api or /docs or /openapi.json
-        if full_path.startswith("api") or full_path in ("docs", "redoc", "openapi.json"):
-            from starlette.exceptions import HTTPException
-            raise HTTPException(status_code=404)
-        file_path = STATIC_DIR / full_path
-        if full_path and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(STATIC_DIR / "index.html")
+    # Mounted last so the /api routes and /docs registered above take precedence
+    app.mount("/", SPAStaticFiles(directory=STATIC_DIR, html=True), name="spa")
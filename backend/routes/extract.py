@@ -1,42 +1,163 @@
 """
 POST /api/extract — receives a data table image, returns extracted table data via Gemini Vision.
+POST /api/extract/batch — the same for several images at once.
 """
 
 from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from services.ocr import extract_table_from_image
+from services.ocr import extract_table_from_image_async, extract_tables_batch
 
 router = APIRouter()
 
+# Hard cap on accepted upload size — phone photos of a table are well below this
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
 
-@router.post("/extract")
-async def extract(image: UploadFile = File(...), mode: str = Form("straight-line")):
-    # Validate file type
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Uploaded file exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit.",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Enforce MAX_UPLOAD_BYTES on /api/extract* request bodies as they arrive.
+
+    FastAPI only resolves route dependencies after the multipart body has
+    been received and parsed, so the cap has to live at the ASGI level. A
+    declared Content-Length over the cap is answered with 413 before any of
+    the body is read; otherwise the received bytes are counted and the
+    request is aborted with 413 as soon as they pass the cap.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api/extract") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > MAX_UPLOAD_BYTES:
+                    err = _too_large()
+                    response = JSONResponse({"detail": err.detail}, status_code=err.status_code)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_UPLOAD_BYTES:
+                    # Raised while FastAPI reads the form, which re-raises
+                    # HTTPExceptions, so the client gets the 413 response
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(upload: UploadFile) -> bytearray:
+    """Read an upload in chunks into a single buffer, capped at MAX_UPLOAD_BYTES."""
+    if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+    buf = bytearray()
+    while chunk := await upload.read(READ_CHUNK_BYTES):
+        if len(buf) + len(chunk) > MAX_UPLOAD_BYTES:
+            raise _too_large()
+        buf += chunk
+    return buf
+
+
+def _ocr_error(e: Exception) -> HTTPException:
+    """Map an exception from the OCR service to the HTTP error reported for it."""
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=422, detail=str(e))
+    if isinstance(e, RuntimeError):
+        return HTTPException(status_code=500, detail=str(e))
+    err_msg = str(e)
+    if "429" in err_msg or "rate_limit" in err_msg.lower():
+        return HTTPException(
+            status_code=429,
+            detail="API rate limit exceeded. Please wait a moment and try again.",
+        )
+    return HTTPException(status_code=500, detail=f"OCR extraction failed: {err_msg}")
+
+
+async def _read_image(image: UploadFile) -> bytearray:
+    """Validate an uploaded image and return its bytes."""
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Uploaded file is not an image.")
 
-    image_bytes = await image.read()
+    image_bytes = await read_upload(image)
 
     if len(image_bytes) == 0:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    return image_bytes
+
+
+@router.post("/extract")
+async def extract(image: UploadFile = File(...), mode: str = Form("straight-line")):
+    image_bytes = await _read_image(image)
 
     try:
-        result = extract_table_from_image(
+        # AsyncGroq awaits the API round-trip on the event loop, so no
+        # threadpool thread is held while the vision model works.
+        result = await extract_table_from_image_async(
             image_bytes=image_bytes,
             mime_type=image.content_type,
             mode=mode,
         )
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        err_msg = str(e)
-        if "429" in err_msg or "rate_limit" in err_msg.lower():
-            raise HTTPException(
-                status_code=429,
-                detail="API rate limit exceeded. Please wait a moment and try again.",
-            )
-        raise HTTPException(status_code=500, detail=f"OCR extraction failed: {err_msg}")
+        raise _ocr_error(e)
 
     return result
+
+
+@router.post("/extract/batch")
+async def extract_batch(
+    images: list[UploadFile] = File(...), mode: str = Form("straight-line")
+):
+    """
+    OCR several images with the same mode in one round-trip.
+
+    The vision calls run concurrently. An image that fails gets an
+    {error, status} entry instead of failing the whole batch.
+    """
+    if not images:
+        raise HTTPException(status_code=400, detail="Need at least 1 image.")
+
+    # Read sequentially — each upload is capped, and so is the whole body.
+    # A file that is not a usable image gets its error entry here and is
+    # left out of the OCR calls.
+    items: list[dict | None] = [None] * len(images)
+    pending = []
+    for i, image in enumerate(images):
+        try:
+            data = await _read_image(image)
+        except HTTPException as err:
+            items[i] = {"error": err.detail, "status": err.status_code}
+            continue
+        pending.append((i, (data, image.content_type, mode)))
+
+    results = await extract_tables_batch([item for _, item in pending])
+
+    for (i, _), result in zip(pending, results):
+        if isinstance(result, Exception):
+            err = _ocr_error(result)
+            items[i] = {"error": err.detail, "status": err.status_code}
+        else:
+            items[i] = result
+    return {"results": items}
@@ -2,127 +2,301 @@
 POST /api/fit — receives confirmed data points + mode, returns fitted equation + graph image.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import copy
+import importlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Literal
+
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 
-from services.fitting import (
-    fit_straight_line,
-    fit_cmc,
-    fit_photoelectric_vi,
-    fit_photoelectric_h,
-    fit_single_slit,
-    fit_newtons_rings,
-    fit_pohls_damped,
-    fit_pohls_forced,
-    fit_polarization,
-    fit_waves_rope,
-    fit_waves_sound,
-)
-from services.plotting import generate_graph
+if TYPE_CHECKING:
+    import numpy as np
 
 router = APIRouter()
 
-# Modes that accept more than 2 columns per row (multi-series data)
-MULTI_SERIES_MODES = {
-    "photoelectric-1-1",
-    "photoelectric-1-3",
-    "pohls-damped",
-    "pohls-forced",
+# Graph image encodings a client may ask for (see services.plotting)
+ImageFormat = Literal["png", "webp", "svg"]
+
+# Mode → fitting function. Every entry takes (points, columns) so the endpoint
+# can dispatch with a single dict lookup.
+FitFunction = Callable[["np.ndarray", list[str]], dict]
+
+
+def _lazy_fit(name: str, takes_columns: bool = False) -> FitFunction:
+    """
+    Wrap services.fitting.<name> without importing it yet.
+
+    SciPy/NumPy are only loaded by the first fit request, so workers that
+    only serve /api/health or static files start fast and stay small.
+    """
+    def call(points: "np.ndarray", columns: list[str]) -> dict:
+        fn = getattr(importlib.import_module("services.fitting"), name)
+        return fn(points, columns) if takes_columns else fn(points)
+    return call
+
+
+# Mode → (fitting function, required values per row). A width of None marks a
+# multi-series mode: any width ≥ 2, as long as every row has the same width.
+FIT_DISPATCH: dict[str, tuple[FitFunction, int | None]] = {
+    "straight-line": (_lazy_fit("fit_straight_line"), 2),
+    "cmc": (_lazy_fit("fit_cmc"), 2),
+    "photoelectric-1-1": (_lazy_fit("fit_photoelectric_vi", takes_columns=True), None),
+    "photoelectric-1-2": (_lazy_fit("fit_photoelectric_h"), 2),
+    "photoelectric-1-3": (_lazy_fit("fit_photoelectric_vi", takes_columns=True), None),
+    "single-slit": (_lazy_fit("fit_single_slit"), 2),
+    "newtons-rings": (_lazy_fit("fit_newtons_rings"), 2),
+    "pohls-damped": (_lazy_fit("fit_pohls_damped", takes_columns=True), None),
+    "pohls-forced": (_lazy_fit("fit_pohls_forced", takes_columns=True), None),
+    "polarization": (_lazy_fit("fit_polarization"), 2),
 }
 
+# Modes that accept more than 2 columns per row (multi-series data)
+MULTI_SERIES_MODES = frozenset(
+    mode for mode, (_, width) in FIT_DISPATCH.items() if width is None
+)
+
+
+def _as_table(points: list[list[float]]) -> "np.ndarray | None":
+    """
+    Convert validated rows to a 2-D float64 array in one C-level pass.
+
+    Returns None when the rows are ragged, in which case the caller falls
+    back to a per-row scan to report which row is malformed.
+    """
+    import numpy as np
+
+    try:
+        arr = np.asarray(points, dtype=np.float64)
+    except ValueError:
+        return None
+    return arr if arr.ndim == 2 else None
+
+
+def _fit_and_plot(
+    mode: str,
+    shape: tuple[int, ...],
+    data: bytes,
+    columns: tuple[str, ...],
+    image_format: ImageFormat = "png",
+) -> tuple[dict, bytes]:
+    """
+    Run the fit and render the graph for an already-validated table.
+
+    /api/fit is deterministic in (mode, points, columns, image format) and
+    users often re-submit the same table, so results are memoised on the raw
+    float64 bytes of the points. Each call gets its own copy of fit_params,
+    so a caller that mutates it can't corrupt later cache hits. Errors raise
+    HTTPException and are never cached.
+    """
+    fit_params, graph = _cached_fit_and_plot(mode, shape, data, columns, image_format)
+    return copy.deepcopy(fit_params), graph
+
+
+@lru_cache(maxsize=256)
+def _cached_fit_and_plot(
+    mode: str,
+    shape: tuple[int, ...],
+    data: bytes,
+    columns: tuple[str, ...],
+    image_format: ImageFormat,
+) -> tuple[dict, bytes]:
+    """Memoised body of _fit_and_plot; never hand its fit_params out directly."""
+    import numpy as np
+    from services.plotting import render_graph
+
+    arr = np.frombuffer(data, dtype=np.float64).reshape(shape)
+    column_list = list(columns)
+
+    try:
+        fit_params = FIT_DISPATCH[mode][0](arr, column_list)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fitting error: {str(e)}")
+
+    try:
+        # This cache already holds the graph, so skip the render-level one
+        graph = render_graph(
+            arr, fit_params, mode, column_list, image_format, cache=False
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Graph generation error: {str(e)}"
+        )
+
+    return fit_params, graph
+
 
 class FitRequest(BaseModel):
     mode: str
     points: list[list[float]]
     columns: list[str] = []
+    image_format: ImageFormat = "png"
 
 
-@router.post("/fit")
-async def fit(req: FitRequest):
+def _validate_fit_request(req: FitRequest) -> "np.ndarray":
+    """Check a FitRequest and return its points as a 2-D float64 array."""
     if len(req.points) < 2:
         raise HTTPException(status_code=400, detail="Need at least 2 data points.")
 
-    # Validate row widths — strict 2-value check only for non-multi-series modes
-    if req.mode not in MULTI_SERIES_MODES:
-        for i, pt in enumerate(req.points):
-            if len(pt) != 2:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Row {i + 1} must have exactly 2 values, got {len(pt)}.",
-                )
+    spec = FIT_DISPATCH.get(req.mode)
+    if spec is None:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fitting mode: '{req.mode}'"
+        )
+    _, width = spec
+
+    # Validate row widths — strict check only for non-multi-series modes.
+    # A rectangular array answers the width check from its shape; the per-row
+    # loops only run when something is wrong, to name the offending row.
+    arr = _as_table(req.points)
+    if width is not None:
+        if arr is None or arr.shape[1] != width:
+            for i, pt in enumerate(req.points):
+                if len(pt) != width:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Row {i + 1} must have exactly {width} values, got {len(pt)}.",
+                    )
     else:
         # Multi-series: ensure all rows are the same width (≥ 2)
         width = len(req.points[0])
         if width < 2:
             raise HTTPException(status_code=400, detail="Need at least 2 columns.")
-        for i, pt in enumerate(req.points):
-            if len(pt) != width:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Row {i + 1} has {len(pt)} values, expected {width}.",
-                )
-
-    try:
-        if req.mode == "straight-line":
-            fit_params = fit_straight_line(req.points)
-        elif req.mode == "cmc":
-            if len(req.points) < 4:
-                raise HTTPException(
-                    status_code=400,
-                    detail="CMC fitting requires at least 4 data points.",
-                )
-            fit_params = fit_cmc(req.points)
-        elif req.mode in ("photoelectric-1-1", "photoelectric-1-3"):
-            fit_params = fit_photoelectric_vi(req.points, req.columns)
-        elif req.mode == "photoelectric-1-2":
-            fit_params = fit_photoelectric_h(req.points)
-        elif req.mode == "single-slit":
-            fit_params = fit_single_slit(req.points)
-        elif req.mode == "newtons-rings":
-            fit_params = fit_newtons_rings(req.points)
-        elif req.mode == "pohls-damped":
-            fit_params = fit_pohls_damped(req.points, req.columns)
-        elif req.mode == "pohls-forced":
-            fit_params = fit_pohls_forced(req.points, req.columns)
-        elif req.mode == "polarization":
-            fit_params = fit_polarization(req.points)
-        else:
-            raise HTTPException(
-                status_code=400, detail=f"Unknown fitting mode: '{req.mode}'"
-            )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fitting error: {str(e)}")
+        if arr is None:
+            for i, pt in enumerate(req.points):
+                if len(pt) != width:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Row {i + 1} has {len(pt)} values, expected {width}.",
+                    )
 
-    try:
-        graph_image = generate_graph(req.points, fit_params, req.mode, req.columns)
-    except Exception as e:
+    if req.mode == "cmc" and len(req.points) < 4:
         raise HTTPException(
-            status_code=500, detail=f"Graph generation error: {str(e)}"
+            status_code=400,
+            detail="CMC fitting requires at least 4 data points.",
         )
 
+    return arr
+
+
+# The endpoints are plain `def` so FastAPI runs the CPU-bound SciPy fitting
+# and Matplotlib rendering on its threadpool instead of the event loop.
+@router.post("/fit")
+def fit(req: FitRequest):
+    from services.plotting import image_data_url
+
+    arr = _validate_fit_request(req)
+    fit_params, graph = _fit_and_plot(
+        req.mode, arr.shape, arr.tobytes(), tuple(req.columns), req.image_format
+    )
+
     return {
         "equation": fit_params["equation"],
         "description": fit_params["description"],
         "points": req.points,
         "columns": req.columns,
-        "graphImage": graph_image,
+        "graphImage": image_data_url(graph, req.image_format),
+        "fitParams": fit_params,
+    }
+
+
+@router.post("/fit/image")
+def fit_image(req: FitRequest):
+    """
+    Same input as /api/fit, but returns only the graph as raw PNG (or WebP /
+    SVG) bytes.
+
+    Skips the base64 + JSON round-trip for clients that just need the image.
+    Stateless (no server-side graph IDs), so it works across gunicorn workers,
+    and it shares the /api/fit result cache.
+    """
+    from services.plotting import IMAGE_MEDIA_TYPES
+
+    arr = _validate_fit_request(req)
+    _, graph = _fit_and_plot(
+        req.mode, arr.shape, arr.tobytes(), tuple(req.columns), req.image_format
+    )
+    return Response(content=graph, media_type=IMAGE_MEDIA_TYPES[req.image_format])
+
+
+class FitBatchRequest(BaseModel):
+    modes: list[str]
+    points: list[list[float]]
+    columns: list[str] = []
+    image_format: ImageFormat = "png"
+
+
+def _fit_batch_item(req: FitRequest) -> dict:
+    """Fit one mode of a batch; errors are reported per mode instead of raised."""
+    from services.plotting import image_data_url
+
+    try:
+        arr = _validate_fit_request(req)
+        fit_params, graph = _fit_and_plot(
+            req.mode, arr.shape, arr.tobytes(), tuple(req.columns), req.image_format
+        )
+    except HTTPException as e:
+        return {"error": e.detail, "status": e.status_code}
+
+    return {
+        "equation": fit_params["equation"],
+        "description": fit_params["description"],
+        "graphImage": image_data_url(graph, req.image_format),
         "fitParams": fit_params,
     }
 
 
+@router.post("/fit/batch")
+async def fit_batch(req: FitBatchRequest):
+    """
+    Fit the same table with several modes in one round-trip.
+
+    Each mode runs on the threadpool concurrently. A mode that fails
+    validation or fitting gets an {error, status} entry instead of failing
+    the whole batch.
+    """
+    modes = list(dict.fromkeys(req.modes))  # de-duplicate, keep order
+    if not modes:
+        raise HTTPException(status_code=400, detail="Need at least 1 mode.")
+
+    # The batch body is already validated, so build the per-mode requests
+    # from it without running the points through pydantic again
+    base = FitRequest.model_construct(
+        mode=modes[0],
+        points=req.points,
+        columns=req.columns,
+        image_format=req.image_format,
+    )
+    items = await asyncio.gather(*(
+        asyncio.to_thread(_fit_batch_item, base.model_copy(update={"mode": mode}))
+        for mode in modes
+    ))
+
+    return {
+        "points": req.points,
+        "columns": req.columns,
+        "results": dict(zip(modes, items)),
+    }
+
+
 class FitWavesRequest(BaseModel):
     rope_points: list[list[float]]
     rope_columns: list[str] = []
     sound_points: list[list[float]]
     sound_columns: list[str] = []
+    image_format: ImageFormat = "png"
 
 
 @router.post("/fit-waves")
 async def fit_waves_endpoint(req: FitWavesRequest):
     """Fit both rope wave (Table 1) and sound wave (Table 2) data.
-    Returns two separate graphs and fit parameters."""
+    Returns two separate graphs and fit parameters.
+
+    The two straight-line fits take microseconds, so they run inline; the
+    two graph renders are independent and run side by side, on threads or
+    in the process pool when FIT_PROCESS_WORKERS is set.
+    """
 
     if len(req.rope_points) < 2:
         raise HTTPException(status_code=400, detail="Need at least 2 rope data points.")
@@ -130,38 +304,51 @@ async def fit_waves_endpoint(req: FitWavesRequest):
         raise HTTPException(status_code=400, detail="Need at least 2 sound data points.")
 
     # Validate row widths
-    for i, pt in enumerate(req.rope_points):
-        if len(pt) != 3:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Rope row {i + 1} must have 3 values (group, 1/ν, λ), got {len(pt)}.",
-            )
-    for i, pt in enumerate(req.sound_points):
-        if len(pt) != 2:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Sound row {i + 1} must have 2 values (freq, length_cm), got {len(pt)}.",
-            )
+    rope_arr = _as_table(req.rope_points)
+    sound_arr = _as_table(req.sound_points)
+    if rope_arr is None or rope_arr.shape[1] != 3:
+        for i, pt in enumerate(req.rope_points):
+            if len(pt) != 3:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Rope row {i + 1} must have 3 values (group, 1/ν, λ), got {len(pt)}.",
+                )
+    if sound_arr is None or sound_arr.shape[1] != 2:
+        for i, pt in enumerate(req.sound_points):
+            if len(pt) != 2:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Sound row {i + 1} must have 2 values (freq, length_cm), got {len(pt)}.",
+                )
+
+    from services.executor import run_in_process
+    from services.fitting import fit_waves_rope, fit_waves_sound
+    from services.plotting import generate_graph
 
     try:
-        rope_fit = fit_waves_rope(req.rope_points)
+        rope_fit = fit_waves_rope(rope_arr)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rope wave fitting error: {str(e)}")
-
     try:
-        sound_fit = fit_waves_sound(req.sound_points)
+        sound_fit = fit_waves_sound(sound_arr)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sound wave fitting error: {str(e)}")
 
-    try:
-        rope_graph = generate_graph(req.rope_points, rope_fit, "waves-rope", req.rope_columns)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Rope graph error: {str(e)}")
-
-    try:
-        sound_graph = generate_graph(req.sound_points, sound_fit, "waves-sound", req.sound_columns)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Sound graph error: {str(e)}")
+    rope_graph, sound_graph = await asyncio.gather(
+        run_in_process(
+            generate_graph, rope_arr, rope_fit, "waves-rope", req.rope_columns,
+            req.image_format,
+        ),
+        run_in_process(
+            generate_graph, sound_arr, sound_fit, "waves-sound", req.sound_columns,
+            req.image_format,
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(rope_graph, Exception):
+        raise HTTPException(status_code=500, detail=f"Rope graph error: {str(rope_graph)}")
+    if isinstance(sound_graph, Exception):
+        raise HTTPException(status_code=500, detail=f"Sound graph error: {str(sound_graph)}")
 
     return {
         "equation": (
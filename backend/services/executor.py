@@ -0,0 +1,80 @@
+"""
+Optional process pool for CPU-bound fitting and plotting work.
+
+SciPy's solvers call back into Python residual functions and Matplotlib
+rendering is mostly pure Python, so both hold the GIL — independent jobs
+only run truly in parallel in separate processes. Each spawned worker costs
+about 110 MB and a ~2 s start-up, though, so the pool is opt-in: without
+FIT_PROCESS_WORKERS the jobs run on the threadpool instead.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Pre-import the heavy modules so the first job in each process is fast."""
+    import services.fitting  # noqa: F401
+    import services.plotting  # noqa: F401  (selects the Agg backend)
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """
+    Return the shared pool, creating it on first use.
+
+    Size comes from FIT_PROCESS_WORKERS; unset or 0 (the default) means no
+    pool, and None is returned. Every server worker gets its own pool, so
+    with 2 gunicorn workers even 2 processes each add ~450 MB — too much
+    for the 512 MB Render instance. Workers are started with "spawn" so they
+    never inherit the server's threads or open sockets mid-fork.
+    """
+    global _pool
+    if _pool is None:
+        workers = int(os.getenv("FIT_PROCESS_WORKERS", "0"))
+        if workers <= 0:
+            return None
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the pool's worker processes (called on app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def run_in_process(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(*args) in the process pool and await its result.
+
+    Without a pool (FIT_PROCESS_WORKERS unset) fn runs on a worker thread.
+    fn and args must be picklable (module-level functions, NumPy arrays,
+    plain containers). If a worker process dies the pool is discarded so
+    the next call starts a fresh one.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        shutdown_process_pool()
+        raise
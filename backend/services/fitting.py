@@ -2,40 +2,62 @@
 Curve fitting service — fits parametric equations to data based on the selected mode.
 """
 
+from functools import partial
+
 import numpy as np
-from scipy.optimize import curve_fit
+from scipy.optimize import curve_fit, least_squares
 
 
-def fit_straight_line(points: list[list[float]]) -> dict:
+def _sort_if_needed(arr: np.ndarray) -> np.ndarray:
     """
-    Fit y = mx + c using least-squares linear regression.
+    Return arr sorted by its first column.
 
-    Returns dict with m, c, equation string, r_squared.
+    OCR preserves table order, so the rows usually arrive sorted already;
+    one vectorised comparison then skips the argsort and full-table gather.
+    The sort is stable, so rows with equal keys keep their table order.
     """
-    arr = np.array(points, dtype=float)
-    x = arr[:, 0]
-    y = arr[:, 1]
-    n = len(x)
+    key = arr[:, 0]
+    if np.all(key[1:] >= key[:-1]):
+        return arr
+    return arr[key.argsort(kind="stable")]
+
 
-    # Closed-form least squares: m = (n Σxy − Σx Σy) / (n Σx² − (Σx)²)
-    sum_x = np.sum(x)
-    sum_y = np.sum(y)
-    sum_xy = np.sum(x * y)
-    sum_x2 = np.sum(x ** 2)
+def _fit_line_xy(x: np.ndarray, y: np.ndarray, fast: bool = False) -> dict:
+    """
+    Fit y = mx + c to 1-D x / y arrays using least-squares linear regression.
 
-    denom = n * sum_x2 - sum_x ** 2
-    if abs(denom) < 1e-15:
+    Fast path for the fitters that derive transformed columns (D², 1/ν, ...)
+    and would otherwise round-trip them through a list of points.
+    Returns dict with m, c, equation string, r_squared. With fast=True only
+    m, c and r_squared are returned, for callers that write their own
+    equation and description.
+    """
+    # Closed-form least squares on mean-centred data:
+    #   m = Σ(x − x̄)(y − ȳ) / Σ(x − x̄)²,   c = ȳ − m·x̄
+    # Centring first keeps the normal equations well-conditioned when x is
+    # tiny (e.g. 1e-3 mol/L) or huge (e.g. 1e15 Hz), where n·Σx² − (Σx)²
+    # loses most of its significant digits to cancellation.
+    x_mean = x.mean()
+    y_mean = y.mean()
+    xc = x - x_mean
+    yc = y - y_mean
+    sxx = xc @ xc
+
+    if np.ptp(x) == 0 or not sxx > 0:
         raise ValueError("All x-values are identical; cannot fit a line.")
 
-    m = (n * sum_xy - sum_x * sum_y) / denom
-    c = (sum_y - m * sum_x) / n
+    m = (xc @ yc) / sxx
+    c = y_mean - m * x_mean
 
-    # R² = 1 − SS_res / SS_tot
-    y_pred = m * x + c
-    ss_res = np.sum((y - y_pred) ** 2)
-    ss_tot = np.sum((y - np.mean(y)) ** 2)
+    # R² = 1 − SS_res / SS_tot, with residuals y − (mx + c) = yc − m·xc
+    resid = yc - m * xc
+    ss_res = resid @ resid
+    ss_tot = yc @ yc
     r_sq = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
 
+    if fast:
+        return {"m": float(m), "c": float(c), "r_squared": float(r_sq)}
+
     # Format equation string
     sign = "+" if c >= 0 else "−"
     c_abs = abs(c)
@@ -53,7 +75,18 @@ def fit_straight_line(points: list[list[float]]) -> dict:
     }
 
 
-def _szyszkowski_continuous(x, a, b, c, x0):
+def fit_straight_line(points: list[list[float]], fast: bool = False) -> dict:
+    """
+    Fit y = mx + c using least-squares linear regression.
+
+    Returns dict with m, c, equation string, r_squared (see _fit_line_xy
+    for fast=True).
+    """
+    arr = np.asarray(points, dtype=float)
+    return _fit_line_xy(arr[:, 0], arr[:, 1], fast=fast)
+
+
+def _szyszkowski_continuous(x, a, b, c, x0, x_safe=None, assume_sorted=False):
     """
     Szyszkowski-type piecewise model for CMC detection (continuous).
 
@@ -71,16 +104,84 @@ def _szyszkowski_continuous(x, a, b, c, x0):
 
     Continuity is enforced: the plateau value equals the curve value at x0.
     This reduces the problem to 4 free parameters: a, b, c, x0.
+
+    x_safe, if given, is np.maximum(x, 0) precomputed by a caller that
+    evaluates the model many times on the same x (e.g. inside the solver).
+    With assume_sorted=True (x ascending) the two regions are contiguous, so
+    the log is only evaluated on the pre-CMC slice.
     """
     # Clamp x to non-negative to avoid log of negative numbers
-    x_safe = np.clip(x, 0, None)
+    if x_safe is None:
+        x_safe = np.maximum(x, 0.0)
     # Plateau = curve value at the breakpoint x0
-    plateau = a + b * np.log(1.0 + c * max(x0, 1e-15))
-    return np.where(
-        x < x0,
-        a + b * np.log(1.0 + c * x_safe),
-        plateau,
-    )
+    plateau = a + b * np.log1p(c * max(x0, 1e-15))
+    # Evaluate the curve in place in one output buffer — the solver calls
+    # this on every iteration, so skip the temporaries of a + b·log1p(c·x)
+    # Either way the log is only taken on the pre-CMC points.
+    if assume_sorted:
+        k = np.searchsorted(x, x0)  # x[:k] < x0 <= x[k:]
+        out = np.empty(len(x))
+        curve = out[:k]
+        np.multiply(x_safe[:k], c, out=curve)
+        out[k:] = plateau
+    else:
+        left = x < x0
+        out = np.full(len(x), plateau)
+        curve = x_safe[left] * c  # boolean indexing gives a fresh buffer
+    np.log1p(curve, out=curve)
+    curve *= b
+    curve += a
+    if not assume_sorted:
+        out[left] = curve
+    return out
+
+
+def _szyszkowski_jac(x, a, b, c, x0, x_safe=None, assume_sorted=False):
+    """
+    Analytic Jacobian of _szyszkowski_continuous, shape (len(x), 4).
+
+    Pre-CMC rows:  ∂/∂(a, b, c, x0) = (1, ln(1 + c·x), b·x / (1 + c·x), 0)
+    Plateau rows:  ∂/∂(a, b, c, x0) = (1, ln(1 + c·x0), b·x0 / (1 + c·x0),
+                                       b·c / (1 + c·x0))
+
+    x_safe and assume_sorted have the same meaning as for the model.
+    """
+    if x_safe is None:
+        x_safe = np.maximum(x, 0.0)
+    x0_safe = max(x0, 1e-15)
+
+    if assume_sorted:
+        # Every plateau row is the same constant row: fill the two
+        # contiguous blocks directly
+        k = np.searchsorted(x, x0)  # x[:k] < x0 <= x[k:]
+        xl = x_safe[:k]
+        cx = c * xl
+        denom0 = 1.0 + c * x0_safe
+
+        jac = np.empty((len(x), 4))
+        jac[:, 0] = 1.0
+        jac[:k, 1] = np.log1p(cx)
+        jac[:k, 2] = b * xl / (1.0 + cx)
+        jac[:k, 3] = 0.0
+        jac[k:, 1] = np.log1p(c * x0_safe)
+        jac[k:, 2] = b * x0_safe / denom0
+        jac[k:, 3] = b * c / denom0
+        return jac
+
+    left = x < x0
+
+    # Evaluate the pre-CMC expressions at x and the plateau ones at x0,
+    # then assemble both row types in one pass
+    xe = np.where(left, x_safe, x0_safe)
+    cx = c * xe
+    denom = 1.0 + cx
+
+    jac = np.empty((len(x), 4))
+    jac[:, 0] = 1.0
+    jac[:, 1] = np.log1p(cx)
+    jac[:, 2] = b * xe / denom
+    jac[:, 3] = np.where(left, 0.0, b * c / denom)
+    return jac
 
 
 def fit_cmc(points: list[list[float]]) -> dict:
@@ -96,7 +197,7 @@ def fit_cmc(points: list[list[float]]) -> dict:
            For each candidate, fit a, b, c on the left segment only and
            compute total RSS (left curve + right plateau).
         2. Use the best grid-search result as the initial guess for a full
-           4-parameter curve_fit over the continuous model.
+           4-parameter least-squares fit of the continuous model.
         3. Compute R² and build human-readable equation strings.
 
     Parameters
@@ -108,9 +209,9 @@ def fit_cmc(points: list[list[float]]) -> dict:
     dict with cmc_value, fitted parameters (a, b, c), equations, r_squared, etc.
     """
     # ── Data preparation ─────────────────────────────────────────────
-    arr = np.array(points, dtype=float)
+    arr = np.asarray(points, dtype=float)
     # Sort by concentration (x-axis) so fitting is monotonic
-    arr = arr[arr[:, 0].argsort()]
+    arr = _sort_if_needed(arr)
     x = arr[:, 0]
     y = arr[:, 1]
 
@@ -118,6 +219,17 @@ def fit_cmc(points: list[list[float]]) -> dict:
     if n < 5:
         raise ValueError("Need at least 5 data points to fit the CMC model.")
 
+    # x is fixed for the whole fit, so clamp it once instead of on every
+    # grid / model / Jacobian evaluation
+    x_safe = np.maximum(x, 0.0)
+
+    # Centre y once.  The Phase-1 sums run on the deviations, which keeps
+    # Σy² − (Σy)²/n free of cancellation (y ≈ 70 mN/m, noise ≈ 0.1), and the
+    # same deviations give SS_tot for the final R².
+    y_mean = y.mean()
+    yc = y - y_mean
+    ss_tot = yc @ yc
+
     # ── Initial parameter guesses ────────────────────────────────────
     # a ≈ surface tension of pure solvent (highest y, usually the first point)
     a_guess = float(y.max())
@@ -133,72 +245,152 @@ def fit_cmc(points: list[list[float]]) -> dict:
     # The right segment is modelled as a horizontal line (plateau).
     # The optimal plateau is simply the mean of points on the right,
     # and the RSS for a horizontal line = sum of squared deviations
-    # from that mean.  No curve_fit needed — this is O(n) per candidate
-    # and extremely fast.
+    # from that mean.
+    #
+    # The left segment is the log curve.  For a fixed c it is linear in
+    # a and b (y = a + b·L with L = ln(1 + c·x)), so over a small log-spaced
+    # grid of c values a, b come from closed-form OLS.  No curve_fit
+    # needed — and since x is sorted, every candidate's left segment is a
+    # prefix and its right segment a suffix, so all the sums for every
+    # (c, x0) pair come from cumulative sums in one vectorised pass:
+    #     RSS_right = Σy² − (Σy)² / n_r
+    #     b = (k·ΣLy − ΣL·Σy) / (k·ΣL² − (ΣL)²),  a = (Σy − b·ΣL) / k
+    #     RSS_left  = Σy² − a·Σy − b·ΣLy
     #
-    # The candidate x0 with the smallest right-side RSS tells us
-    # where the data starts to flatten, i.e. the CMC region.
-    best_rss = float("inf")
+    # The (c, x0) pair with the smallest total RSS seeds Phase 2 with
+    # a, b, c as well as x0.
     best_x0 = x0_guess
 
-    # Build candidate breakpoint list: data x-values plus extra linspace points
-    candidates = np.unique(
-        np.concatenate([
-            x[2:-2],  # skip edges to ensure enough points per segment
-            np.linspace(x[2], x[-2], min(50, n)),
-        ])
-    )
+    # Build candidate breakpoint list: data x-values plus extra linspace points.
+    # Duplicates are harmless (they score identically), so fill one buffer
+    # and sort it instead of concatenate + unique.
+    n_lin = min(50, n)
+    candidates = np.empty(n - 4 + n_lin)
+    candidates[:n - 4] = x[2:-2]  # skip edges to ensure enough points per segment
+    candidates[n - 4:] = np.linspace(x[2], x[-2], n_lin)
+    candidates.sort()
+
+    # Index of the first point with x >= x0_cand
+    start = np.searchsorted(x, candidates, side="left")
+    n_right = n - start
+
+    # Need at least 3 points on the left to fit a, b with a residual, and
+    # at least 2 on the right to compute a meaningful plateau
+    valid = (start >= 3) & (n_right >= 2)
+    if valid.any():
+        start = start[valid]
+        candidates = candidates[valid]
+
+        # Left-segment sums: inclusive cumsum at index k−1 = Σ over [0, k)
+        cum_y = np.cumsum(yc)
+        cum_y2 = np.cumsum(yc * yc)
+
+        # Surface tension falls towards the plateau, so a candidate whose
+        # right-segment mean is still in the upper half of the y range
+        # cannot be the CMC.  Prune those before the c-grid OLS (unless
+        # that would leave nothing to score).
+        right_mean = (cum_y[-1] - cum_y[start - 1]) / (n - start)
+        low = right_mean < 0.5 * (yc.min() + yc.max())
+        if low.any():
+            start = start[low]
+            candidates = candidates[low]
+
+        k = start.astype(float)
+        n_r = n - k
+
+        c_grid = np.geomspace(c_guess * 1e-3, c_guess * 10.0, 8)
+        L = np.log1p(c_grid[:, None] * x_safe)  # shape (len(c_grid), n)
+
+        sum_y, sum_y2 = cum_y[start - 1], cum_y2[start - 1]
+        sum_L = np.cumsum(L, axis=1)[:, start - 1]
+        sum_L2 = np.cumsum(L * L, axis=1)[:, start - 1]
+        sum_Ly = np.cumsum(L * yc, axis=1)[:, start - 1]
+
+        # Right-segment sums are the totals minus the left ones
+        right_y = cum_y[-1] - sum_y
+        right_y2 = cum_y2[-1] - sum_y2
+        rss_right = right_y2 - right_y ** 2 / n_r
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b_grid = (k * sum_Ly - sum_L * sum_y) / (k * sum_L2 - sum_L ** 2)
+            a_grid = (sum_y - b_grid * sum_L) / k
+            rss = sum_y2 - a_grid * sum_y - b_grid * sum_Ly + rss_right
+        rss = np.where(np.isfinite(rss), rss, np.inf)
+
+        i_c, i_x0 = np.unravel_index(np.argmin(rss), rss.shape)
+        if np.isfinite(rss[i_c, i_x0]):
+            a_guess = float(a_grid[i_c, i_x0] + y_mean)  # undo the centring
+            b_guess = float(b_grid[i_c, i_x0])
+            c_guess = float(c_grid[i_c])
+            best_x0 = float(candidates[i_x0])
 
-    for x0_cand in candidates:
-        mask_right = x >= x0_cand
+    # ── Phase 2: Full nonlinear refinement ───────────────────────────
+    # Use the best grid-search result to seed a least-squares fit of all 4
+    # parameters on the full continuous model. This fits the log curve (a, b, c)
+    # and fine-tunes x0 to a value that may lie *between* data points.
+    p0_full = [a_guess, b_guess, c_guess, best_x0]
 
-        # Need at least 2 points on the right to compute a meaningful plateau
-        if mask_right.sum() < 2:
-            continue
+    # Solve the bounded problem with least_squares directly (curve_fit would
+    # only wrap it), so the residuals are formed in place and the final
+    # residual vector is reused for R²
+    model = partial(_szyszkowski_continuous, x_safe=x_safe, assume_sorted=True)
+    model_jac = partial(_szyszkowski_jac, x_safe=x_safe, assume_sorted=True)
 
-        y_right = y[mask_right]
+    def residuals(p):
+        r = model(x, *p)
+        r -= y
+        return r
 
-        # Best horizontal line through the right segment = its mean
-        plateau = y_right.mean()
-        rss = np.sum((y_right - plateau) ** 2)
+    def residuals_jac(p):
+        return model_jac(x, *p)
 
-        if rss < best_rss:
-            best_rss = rss
-            best_x0 = float(x0_cand)
+    bounds = (
+        [-np.inf, -np.inf, 1e-12, float(x.min())],  # x0 within data range
+        [np.inf,   np.inf, np.inf, float(x.max())],
+    )
 
-    # ── Phase 2: Full nonlinear refinement ───────────────────────────
-    # Use the best grid-search x0 to seed a curve_fit over all 4 parameters
-    # on the full continuous model. This fits the log curve (a, b, c)
-    # and fine-tunes x0 to a value that may lie *between* data points.
-    p0_full = [a_guess, b_guess, c_guess, best_x0]
+    # The Phase-1 warm start is normally a few iterations from the optimum,
+    # and the data are only good to ~0.1 mN/m, so first try a small budget
+    # at 1e-6 tolerances.  Only if that fails to converge does the fit pay
+    # for the full-precision, 20 000-evaluation solve.
+    solution = None
+    for solver_opts in (
+        {"max_nfev": 200, "ftol": 1e-6, "xtol": 1e-6, "gtol": 1e-6},
+        {"max_nfev": 20000},
+    ):
+        try:
+            result = least_squares(
+                residuals,
+                p0_full,
+                jac=residuals_jac,
+                bounds=bounds,
+                method="trf",
+                # a, b, c, x0 differ by orders of magnitude (≈70, ≈−30, ≈1e3,
+                # ≈1e-2); scale each step by its Jacobian column norm
+                x_scale="jac",
+                **solver_opts,
+            )
+        except ValueError:
+            continue
+        if result.success:
+            solution = result
+            break
 
-    try:
-        popt_final, pcov = curve_fit(
-            _szyszkowski_continuous,
-            x, y,
-            p0=p0_full,
-            bounds=(
-                [-np.inf, -np.inf, 1e-12, float(x.min())],  # x0 within data range
-                [np.inf,   np.inf, np.inf, float(x.max())],
-            ),
-            maxfev=20000,
-        )
-        a_opt, b_opt, c_opt, x0_opt = popt_final
-    except (RuntimeError, ValueError):
+    if solution is None:
         raise RuntimeError(
             "CMC fitting failed — check that the data has a clear "
             "transition from decreasing surface tension to a plateau."
         )
+    a_opt, b_opt, c_opt, x0_opt = solution.x
 
     # ── Compute derived quantities ───────────────────────────────────
     cmc_value = float(x0_opt)
     # Surface tension at the CMC (plateau value, from continuity)
-    plateau = float(a_opt + b_opt * np.log(1.0 + c_opt * x0_opt))
+    plateau = float(a_opt + b_opt * np.log1p(c_opt * x0_opt))
 
     # Goodness-of-fit: coefficient of determination (R²)
-    y_pred = _szyszkowski_continuous(x, a_opt, b_opt, c_opt, x0_opt)
-    ss_res = np.sum((y - y_pred) ** 2)       # residual sum of squares
-    ss_tot = np.sum((y - np.mean(y)) ** 2)   # total sum of squares
+    resid = solution.fun     # model − y at the solution
+    ss_res = resid @ resid   # residual sum of squares (ss_tot from the top)
     r_sq = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
 
     # ── Build human-readable equation strings ────────────────────────
@@ -234,14 +426,27 @@ def fit_cmc(points: list[list[float]]) -> dict:
 # ─────────────────────────────────────────────────────────────────────
 
 def _find_zero_crossing(x, y):
-    """Find x-value where y crosses zero via linear interpolation."""
-    for j in range(len(y) - 1):
-        if y[j] * y[j + 1] <= 0 and y[j] != y[j + 1]:
-            return float(
-                x[j] + (0 - y[j]) * (x[j + 1] - x[j]) / (y[j + 1] - y[j])
-            )
+    """
+    Find x-value where y crosses zero via linear interpolation.
+
+    y may also be 2-D with one series per column (all sharing x); then an
+    array with one crossing per column is returned.
+    """
+    ys = y.reshape(len(y), -1)
+    cols = np.arange(ys.shape[1])
+
+    # First index j where the sign changes between y[j] and y[j+1]
+    crossing = (ys[:-1] * ys[1:] <= 0) & (ys[:-1] != ys[1:])
+    has_crossing = crossing.any(axis=0)
+    j = np.argmax(crossing, axis=0)
+    y_j, y_next = ys[j, cols], ys[j + 1, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interp = x[j] + (0 - y_j) * (x[j + 1] - x[j]) / (y_next - y_j)
+
     # Fallback: x where |y| is smallest
-    return float(x[np.argmin(np.abs(y))])
+    nearest = x[np.argmin(np.abs(ys), axis=0)]
+    result = np.where(has_crossing, interp, nearest)
+    return float(result[0]) if y.ndim == 1 else result
 
 
 def fit_photoelectric_vi(points: list[list[float]], columns: list[str] = None) -> dict:
@@ -249,8 +454,8 @@ def fit_photoelectric_vi(points: list[list[float]], columns: list[str] = None) -
     V_bias vs photocurrent for multiple wavelengths or separations.
     Finds the stopping potential (V where I → 0) for each series.
     """
-    arr = np.array(points, dtype=float)
-    arr = arr[arr[:, 0].argsort()]
+    arr = np.asarray(points, dtype=float)
+    arr = _sort_if_needed(arr)
     x = arr[:, 0]
     series_count = arr.shape[1] - 1
 
@@ -262,11 +467,13 @@ def fit_photoelectric_vi(points: list[list[float]], columns: list[str] = None) -
         else [f"Series {i + 1}" for i in range(series_count)]
     )
 
+    # Blank trailing columns from OCR have no finite value — skip them.
+    # All series share x, so search every live column for its crossing at once
+    live = np.flatnonzero(np.isfinite(arr[:, 1:]).any(axis=0))
+    v_stops = _find_zero_crossing(x, arr[:, live + 1])
     stopping_potentials = {}
-    for i in range(series_count):
-        y = arr[:, i + 1]
-        v_stop = _find_zero_crossing(x, y)
-        stopping_potentials[series_labels[i]] = round(v_stop, 4)
+    for i, v_stop in zip(live, v_stops):
+        stopping_potentials[series_labels[i]] = round(float(v_stop), 4)
 
     eq_parts = [f"{lbl}: V_stop = {v:.4g} V" for lbl, v in stopping_potentials.items()]
     return {
@@ -287,7 +494,7 @@ def fit_photoelectric_h(points: list[list[float]]) -> dict:
     Stopping voltage vs frequency → linear fit.
     V_stop = (h/e)·ν − W/e  →  slope = h/e  →  h = slope × e.
     """
-    result = fit_straight_line(points)
+    result = fit_straight_line(points, fast=True)
     e = 1.602176634e-19  # C
     h_calc = abs(result["m"]) * e
     h_actual = 6.62607015e-34
@@ -307,7 +514,36 @@ def fit_photoelectric_h(points: list[list[float]]) -> dict:
 def _sinc_squared(theta, I0, alpha, theta0):
     """Single slit diffraction: I = I₀ [sin(β)/β]² where β = α(θ − θ₀)."""
     beta = alpha * (theta - theta0)
-    return np.where(np.abs(beta) < 1e-10, I0, I0 * (np.sin(beta) / beta) ** 2)
+    # np.sinc(x) = sin(πx)/(πx) with the x = 0 limit handled internally
+    return I0 * np.sinc(beta / np.pi) ** 2
+
+
+def _sinc_squared_jac(theta, I0, alpha, theta0):
+    """
+    Analytic Jacobian of _sinc_squared, shape (len(theta), 3).
+
+    With s = sin(β)/β and s' = (cos β − s)/β:
+        ∂I/∂I₀ = s²,  ∂I/∂α = 2·I₀·s·s'·(θ − θ₀),  ∂I/∂θ₀ = −2·I₀·s·s'·α
+    Near β = 0 the Taylor series s' ≈ −β/3 + β³/30 avoids the 0/0
+    cancellation.
+    """
+    dtheta = theta - theta0
+    beta = alpha * dtheta
+    s = np.sinc(beta / np.pi)
+    small = np.abs(beta) < 1e-3
+    b = np.where(small, 1.0, beta)  # dummy value where the series is used
+    ds = np.where(
+        small,
+        -beta / 3.0 + beta ** 3 / 30.0,
+        (np.cos(b) - s) / b,
+    )
+
+    two_i0_s_ds = 2.0 * I0 * s * ds
+    jac = np.empty((len(theta), 3))
+    jac[:, 0] = s * s
+    jac[:, 1] = two_i0_s_ds * dtheta
+    jac[:, 2] = -two_i0_s_ds * alpha
+    return jac
 
 
 def fit_single_slit(points: list[list[float]]) -> dict:
@@ -315,8 +551,8 @@ def fit_single_slit(points: list[list[float]]) -> dict:
     Fit single slit diffraction: I vs θ.
     Model: I = I₀ [sin(α(θ−θ₀)) / (α(θ−θ₀))]²
     """
-    arr = np.array(points, dtype=float)
-    arr = arr[arr[:, 0].argsort()]
+    arr = np.asarray(points, dtype=float)
+    arr = _sort_if_needed(arr)
     theta = arr[:, 0]
     intensity = arr[:, 1]
 
@@ -328,6 +564,7 @@ def fit_single_slit(points: list[list[float]]) -> dict:
         popt, _ = curve_fit(
             _sinc_squared, theta, intensity,
             p0=[I0_guess, alpha_guess, theta0_guess],
+            jac=_sinc_squared_jac,
             maxfev=20000,
         )
         I0, alpha, theta0 = popt
@@ -338,8 +575,10 @@ def fit_single_slit(points: list[list[float]]) -> dict:
         )
 
     y_pred = _sinc_squared(theta, I0, alpha, theta0)
-    ss_res = np.sum((intensity - y_pred) ** 2)
-    ss_tot = np.sum((intensity - np.mean(intensity)) ** 2)
+    resid = intensity - y_pred
+    i_dev = intensity - intensity.mean()
+    ss_res = resid @ resid
+    ss_tot = i_dev @ i_dev
     r_sq = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
 
     return {
@@ -361,13 +600,12 @@ def fit_newtons_rings(points: list[list[float]]) -> dict:
     Transforms to D² vs n, then linear fit.
     D² = slope·n + intercept, where slope = 4Rλ.
     """
-    arr = np.array(points, dtype=float)
+    arr = np.asarray(points, dtype=float)
     n = arr[:, 0]
     d = arr[:, 1]
     d_sq = d ** 2
 
-    transformed = [[float(n[i]), float(d_sq[i])] for i in range(len(n))]
-    result = fit_straight_line(transformed)
+    result = _fit_line_xy(n, d_sq, fast=True)
 
     slope = result["m"]
     intercept = result["c"]
@@ -380,7 +618,7 @@ def fit_newtons_rings(points: list[list[float]]) -> dict:
         f"Slope = {slope:.4f} (= 4Rλ). R² = {r_sq:.6f}."
     )
     result["slope_4Rlambda"] = float(slope)
-    result["transformed_points"] = transformed
+    result["transformed_points"] = np.column_stack((n, d_sq)).tolist()
     return result
 
 
@@ -390,8 +628,8 @@ def fit_pohls_damped(points: list[list[float]], columns: list[str] = None) -> di
     Transforms to ln(φ) and fits a straight line per series.
     ln(φ) = −δ·t + const  →  damping constant δ = −slope.
     """
-    arr = np.array(points, dtype=float)
-    arr = arr[arr[:, 0].argsort()]
+    arr = np.asarray(points, dtype=float)
+    arr = _sort_if_needed(arr)
     t = arr[:, 0]
     series_count = arr.shape[1] - 1
 
@@ -403,27 +641,49 @@ def fit_pohls_damped(points: list[list[float]], columns: list[str] = None) -> di
         else [f"I_d = {i + 1}" for i in range(series_count)]
     )
 
+    # Fit every series at once: each column of ln(φ) is a least-squares
+    # line against the shared t, restricted to that column's φ > 0 rows.
+    # Invalid cells get zero weight, so the per-column sums are plain
+    # axis-0 reductions.
+    phi = arr[:, 1:]
+    valid = phi > 0
+    weight = valid.astype(float)
+    counts = weight.sum(axis=0)
+    fitted = counts >= 2
+    t_col = t[:, None]
+
+    # Identical t within a series cannot be fitted (same guard as fit_straight_line)
+    t_max = np.where(valid, t_col, -np.inf).max(axis=0)
+    t_min = np.where(valid, t_col, np.inf).min(axis=0)
+    if np.any(fitted & (t_max == t_min)):
+        raise ValueError("All x-values are identical; cannot fit a line.")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ln_phi = np.log(np.where(valid, phi, 1.0))  # masked cells → ln 1 = 0
+        t_mean = (weight * t_col).sum(axis=0) / counts
+        y_mean = ln_phi.sum(axis=0) / counts
+        tc = (t_col - t_mean) * weight
+        yc = (ln_phi - y_mean) * weight
+
+        sxx = np.einsum("ij,ij->j", tc, tc)
+        syy = np.einsum("ij,ij->j", yc, yc)
+        slopes = np.einsum("ij,ij->j", tc, yc) / sxx
+        intercepts = y_mean - slopes * t_mean
+        resid = yc - slopes * tc
+        ss_res = np.einsum("ij,ij->j", resid, resid)
+        r_sqs = np.where(syy > 0, 1.0 - ss_res / syy, 0.0)
+
     series_fits = {}
     eq_parts = []
 
-    for i in range(series_count):
-        phi = arr[:, i + 1]
+    for i in np.flatnonzero(fitted):
         label = series_labels[i]
-        mask = phi > 0
-        if mask.sum() < 2:
-            continue
-
-        ln_phi = np.log(phi[mask])
-        t_valid = t[mask]
-        pts = [[float(t_valid[j]), float(ln_phi[j])] for j in range(len(t_valid))]
-        res = fit_straight_line(pts)
-
-        damping = -res["m"]
+        damping = -float(slopes[i])
         series_fits[label] = {
-            "slope": res["m"],
-            "intercept": res["c"],
-            "damping_constant": float(damping),
-            "r_squared": res["r_squared"],
+            "slope": float(slopes[i]),
+            "intercept": float(intercepts[i]),
+            "damping_constant": damping,
+            "r_squared": float(r_sqs[i]),
         }
         eq_parts.append(f"{label}: δ = {damping:.4f}")
 
@@ -445,8 +705,8 @@ def fit_pohls_forced(points: list[list[float]], columns: list[str] = None) -> di
     Forced oscillation: [[freq, A₁, A₂, ...], ...].
     Finds resonance frequency (peak amplitude) for each damping value.
     """
-    arr = np.array(points, dtype=float)
-    arr = arr[arr[:, 0].argsort()]
+    arr = np.asarray(points, dtype=float)
+    arr = _sort_if_needed(arr)
     freq = arr[:, 0]
     series_count = arr.shape[1] - 1
 
@@ -461,7 +721,9 @@ def fit_pohls_forced(points: list[list[float]], columns: list[str] = None) -> di
     resonances = {}
     eq_parts = []
 
-    for i in range(series_count):
+    # Blank trailing columns from OCR have no finite value — skip them
+    live = np.flatnonzero(np.isfinite(arr[:, 1:]).any(axis=0))
+    for i in live:
         amp = arr[:, i + 1]
         label = series_labels[i]
         peak_idx = int(np.argmax(amp))
@@ -491,7 +753,7 @@ def fit_polarization(points: list[list[float]]) -> dict:
     Optical rotation: θ vs c → linear fit.
     θ = [α]·l·c  →  slope = [α]·l.
     """
-    result = fit_straight_line(points)
+    result = fit_straight_line(points, fast=True)
     slope = result["m"]
     r_sq = result["r_squared"]
     sign = "+" if result["c"] >= 0 else "−"
@@ -513,23 +775,24 @@ def fit_waves_rope(points: list[list[float]]) -> dict:
 
     Returns dict with per-group fits, equations, and overall description.
     """
-    arr = np.array(points, dtype=float)
-    groups = np.unique(arr[:, 0])
+    arr = np.asarray(points, dtype=float)
+    # Sort by group ID once, then cut the table into contiguous per-group
+    # views at the points where the ID changes
+    arr = _sort_if_needed(arr)
+    group_starts = np.flatnonzero(np.diff(arr[:, 0]) != 0) + 1
 
     series_fits = {}
     eq_parts = []
     group_labels = []
 
-    for idx, g in enumerate(sorted(groups)):
-        mask = arr[:, 0] == g
-        inv_nu = arr[mask, 1]
-        lam = arr[mask, 2]
+    for idx, group in enumerate(np.split(arr, group_starts)):
+        inv_nu = group[:, 1]
+        lam = group[:, 2]
 
         if len(inv_nu) < 2:
             continue
 
-        transformed = [[float(inv_nu[i]), float(lam[i])] for i in range(len(inv_nu))]
-        result = fit_straight_line(transformed)
+        result = _fit_line_xy(inv_nu, lam, fast=True)
 
         label = f"T{idx + 1}"
         velocity = result["m"]
@@ -543,7 +806,7 @@ def fit_waves_rope(points: list[list[float]]) -> dict:
             "intercept": result["c"],
             "phase_velocity": float(velocity),
             "r_squared": result["r_squared"],
-            "transformed_points": transformed,
+            "transformed_points": np.column_stack((inv_nu, lam)).tolist(),
             "line_equation": line_eq,
         }
         eq_parts.append(f"{label}: {line_eq}  →  v = {velocity:.2f} m/s  (R² = {r_sq:.4f})")
@@ -573,7 +836,7 @@ def fit_waves_sound(points: list[list[float]]) -> dict:
 
     Returns dict with fit parameters and speed of sound.
     """
-    arr = np.array(points, dtype=float)
+    arr = np.asarray(points, dtype=float)
     freq = arr[:, 0]
     length_cm = arr[:, 1]
 
@@ -585,8 +848,7 @@ def fit_waves_sound(points: list[list[float]]) -> dict:
     # For closed pipe, fundamental mode: λ = 4L
     lam = 4.0 * length_cm / 100.0  # convert cm to m
 
-    transformed = [[float(inv_nu[i]), float(lam[i])] for i in range(len(freq))]
-    result = fit_straight_line(transformed)
+    result = _fit_line_xy(inv_nu, lam, fast=True)
 
     velocity = result["m"]
     r_sq = result["r_squared"]
@@ -598,5 +860,5 @@ def fit_waves_sound(points: list[list[float]]) -> dict:
         f"Slope = {velocity:.2f} m/s (speed of sound). R² = {r_sq:.6f}."
     )
     result["phase_velocity"] = float(velocity)
-    result["transformed_points"] = transformed
+    result["transformed_points"] = np.column_stack((inv_nu, lam)).tolist()
     return result
@@ -2,172 +2,321 @@
 OCR service — uses Groq Vision API (Llama 4 Scout) to extract table data from an image.
 """
 
-import base64
-import json
+import asyncio
+import copy
+import hashlib
 import os
-import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
-from groq import Groq
+import orjson
+import pybase64
+from groq import AsyncGroq
+from pydantic import TypeAdapter, ValidationError
 
+# Markdown code fence the model sometimes wraps its JSON in
+_FENCE = "```"
 
-def _get_client() -> Groq:
+# Table rows as the API returns them: numbers (or numeric strings) and nulls,
+# coerced to float by pydantic-core in one compiled pass
+_ROWS_ADAPTER = TypeAdapter(list[list[float | None]])
+
+
+# Per-mode hint about the expected table layout, inserted into the prompt
+_COLUMN_HINTS = {
+    "cmc": (
+        "The table likely has columns for concentration (e.g. mol/L or mM) "
+        "and surface tension (e.g. mN/m or dyne/cm). "
+    ),
+    "straight-line": (
+        "The table likely has two numeric columns representing X and Y values. "
+    ),
+    "photoelectric-1-1": (
+        "The table has V_bias (voltage) in the first column and photocurrent I "
+        "for different wavelengths in subsequent columns. Column headers may "
+        "include wavelength labels like λ=365nm, λ=405nm, etc. "
+    ),
+    "photoelectric-1-2": (
+        "The table has two columns: frequency (ν, in Hz or THz) "
+        "and stopping potential or stopping voltage (V_stop, in Volts). "
+    ),
+    "photoelectric-1-3": (
+        "The table has V_bias (voltage) in the first column and photocurrent I "
+        "for different lamp-phototube separations in subsequent columns. "
+        "Column headers may include distance labels like d=10cm, d=15cm, etc. "
+    ),
+    "single-slit": (
+        "The table has two columns: angle θ (theta, in degrees or radians) "
+        "and intensity I (arbitrary units or measured units). "
+        "θ may be negative for positions on one side of the central maximum. "
+    ),
+    "newtons-rings": (
+        "The table has two columns: ring number n (integer) and "
+        "diameter D_n of the ring (in cm or mm). "
+        "D_n may also be labeled as 'diameter' or 'D'. "
+    ),
+    "pohls-damped": (
+        "The table has time t in the first column and oscillation amplitude φ "
+        "(phi) for different damping currents in subsequent columns. "
+        "Column headers may include damping current labels like I_d=0.2A, etc. "
+    ),
+    "pohls-forced": (
+        "The table has forcing frequency (in Hz or rad/s) in the first column "
+        "and oscillation amplitude for different damping values in subsequent "
+        "columns. Column headers may include damping labels. "
+    ),
+    "polarization": (
+        "The table has two columns: concentration c (e.g. g/mL or mol/L) "
+        "and rotation angle θ (theta, in degrees). "
+    ),
+    "waves-rope": (
+        "This is Table 1: Phase velocity of rope waves (transverse waves). "
+        "The table has 3 groups of rows (typically 4 rows each), separated "
+        "by different tension/mass values like (50+50)g, (100+50)g, (150+50)g. "
+        "For each row, extract ONLY these values: "
+        "  - A group number (1, 2, or 3) based on which tension group the row belongs to "
+        "  - The '1/v' or '1/ν' column value (inverse frequency, in seconds) "
+        "  - The 'λ' or 'λ = 2L/n' column value (wavelength, dimensionless or in meters) "
+        "Return columns: ['group', 'inv_freq', 'wavelength']. "
+        "Group 1 = first/top group, Group 2 = second/middle group, Group 3 = third/bottom group. "
+        "There should be about 12 rows total (4 per group). "
+    ),
+    "waves-sound": (
+        "This is Table 2: Velocity of sound in air (longitudinal waves). "
+        "The table has columns including natural frequency of tuning fork ν (in Hz) "
+        "and length of air column L (in cm). Other columns like 1/v, mode number n, "
+        "λ, and velocity may be empty/unfilled. "
+        "Extract ONLY the frequency (ν in Hz) and the length of air column (L in cm) "
+        "for each row that has data. Ignore empty columns. "
+        "Return columns: ['frequency_hz', 'length_cm']. "
+        "There should be about 6 rows. "
+    ),
+}
+
+
+# OCR prompt; {column_hint} is filled in per mode (literal JSON braces are doubled)
+_PROMPT_TEMPLATE = """You are a precise data-extraction assistant.
+
+Look at this image. It should contain a data table (handwritten or printed).
+
+{column_hint}
+
+Your task:
+1. Identify every column header and every row of numeric data in the table.
+2. Return ONLY valid JSON in this exact format (no markdown, no explanation):
+
+{{"columns": ["column_name_1", "column_name_2"], "rows": [[number, number], [number, number], ...]}}
+
+Rules:
+- Every value in "rows" must be a number (int or float), not a string.
+- If a value looks like scientific notation (e.g. 2.5×10⁻³), convert it to a decimal (0.0025).
+- Preserve the order of rows as they appear in the table.
+- If you cannot find a data table in the image, return exactly: {{"error": "No data table found"}}
+"""
+
+
+@lru_cache(maxsize=1)
+def _get_async_client() -> AsyncGroq:
+    """
+    Return the shared AsyncGroq client, created on first use.
+
+    The client holds a pooled HTTP session, so reusing it across requests
+    keeps connections (and TLS) alive. A missing key raises every time,
+    since exceptions are not cached.
+    """
+    return AsyncGroq(api_key=_api_key())
+
+
+def _api_key() -> str:
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key or api_key.startswith("your_"):
         raise RuntimeError(
             "GROQ_API_KEY is not set. Add it to backend/.env\n"
             "Get a free key at https://console.groq.com/keys"
         )
-    return Groq(api_key=api_key)
+    return api_key
+
 
+# A forked child (e.g. a gunicorn worker forked after the client was built)
+# must not share the parent's pooled sockets — make it build its own.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_get_async_client.cache_clear)
 
-def extract_table_from_image(image_bytes: bytes, mime_type: str, mode: str) -> dict:
+
+# Parsed results of recent extractions, keyed on (image digest, mime, mode).
+# Users retry the same photo or re-run it under another mode, and a hit skips
+# the multi-second vision call. Errors are never cached.
+_RESULT_CACHE_SIZE = 256
+_result_cache: "OrderedDict[tuple[bytes, str, str], dict]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# Everything in the chat completion request except the messages
+_COMPLETION_OPTIONS = {
+    "model": "meta-llama/llama-4-scout-17b-16e-instruct",
+    "temperature": 0.1,
+    "max_completion_tokens": 2048,
+}
+
+
+async def extract_table_from_image_async(
+    image_bytes: bytes, mime_type: str, mode: str
+) -> dict:
     """
     Send the image to Groq Vision and ask it to extract the data table.
 
+    Awaits the API call on the event loop instead of holding a threadpool
+    thread for the whole round-trip. Identical image bytes with the same
+    mime type and mode are answered from an in-process LRU cache without
+    calling the API.
+
     Returns:
         { "columns": ["col1", "col2"], "rows": [[v1, v2], ...] }
 
     Raises:
         ValueError if no table could be detected.
     """
-    client = _get_client()
+    # Checked before the client is created so cache hits don't depend on the API key
+    key = _cache_key(image_bytes, mime_type, mode)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
 
-    if mode == "cmc":
-        column_hint = (
-            "The table likely has columns for concentration (e.g. mol/L or mM) "
-            "and surface tension (e.g. mN/m or dyne/cm). "
-        )
-    elif mode == "straight-line":
-        column_hint = (
-            "The table likely has two numeric columns representing X and Y values. "
-        )
-    elif mode == "photoelectric-1-1":
-        column_hint = (
-            "The table has V_bias (voltage) in the first column and photocurrent I "
-            "for different wavelengths in subsequent columns. Column headers may "
-            "include wavelength labels like λ=365nm, λ=405nm, etc. "
-        )
-    elif mode == "photoelectric-1-2":
-        column_hint = (
-            "The table has two columns: frequency (ν, in Hz or THz) "
-            "and stopping potential or stopping voltage (V_stop, in Volts). "
-        )
-    elif mode == "photoelectric-1-3":
-        column_hint = (
-            "The table has V_bias (voltage) in the first column and photocurrent I "
-            "for different lamp-phototube separations in subsequent columns. "
-            "Column headers may include distance labels like d=10cm, d=15cm, etc. "
-        )
-    elif mode == "single-slit":
-        column_hint = (
-            "The table has two columns: angle θ (theta, in degrees or radians) "
-            "and intensity I (arbitrary units or measured units). "
-            "θ may be negative for positions on one side of the central maximum. "
-        )
-    elif mode == "newtons-rings":
-        column_hint = (
-            "The table has two columns: ring number n (integer) and "
-            "diameter D_n of the ring (in cm or mm). "
-            "D_n may also be labeled as 'diameter' or 'D'. "
-        )
-    elif mode == "pohls-damped":
-        column_hint = (
-            "The table has time t in the first column and oscillation amplitude φ "
-            "(phi) for different damping currents in subsequent columns. "
-            "Column headers may include damping current labels like I_d=0.2A, etc. "
-        )
-    elif mode == "pohls-forced":
-        column_hint = (
-            "The table has forcing frequency (in Hz or rad/s) in the first column "
-            "and oscillation amplitude for different damping values in subsequent "
-            "columns. Column headers may include damping labels. "
-        )
-    elif mode == "polarization":
-        column_hint = (
-            "The table has two columns: concentration c (e.g. g/mL or mol/L) "
-            "and rotation angle θ (theta, in degrees). "
-        )
-    elif mode == "waves-rope":
-        column_hint = (
-            "This is Table 1: Phase velocity of rope waves (transverse waves). "
-            "The table has 3 groups of rows (typically 4 rows each), separated "
-            "by different tension/mass values like (50+50)g, (100+50)g, (150+50)g. "
-            "For each row, extract ONLY these values: "
-            "  - A group number (1, 2, or 3) based on which tension group the row belongs to "
-            "  - The '1/v' or '1/ν' column value (inverse frequency, in seconds) "
-            "  - The 'λ' or 'λ = 2L/n' column value (wavelength, dimensionless or in meters) "
-            "Return columns: ['group', 'inv_freq', 'wavelength']. "
-            "Group 1 = first/top group, Group 2 = second/middle group, Group 3 = third/bottom group. "
-            "There should be about 12 rows total (4 per group). "
-        )
-    elif mode == "waves-sound":
-        column_hint = (
-            "This is Table 2: Velocity of sound in air (longitudinal waves). "
-            "The table has columns including natural frequency of tuning fork ν (in Hz) "
-            "and length of air column L (in cm). Other columns like 1/v, mode number n, "
-            "λ, and velocity may be empty/unfilled. "
-            "Extract ONLY the frequency (ν in Hz) and the length of air column (L in cm) "
-            "for each row that has data. Ignore empty columns. "
-            "Return columns: ['frequency_hz', 'length_cm']. "
-            "There should be about 6 rows. "
-        )
-    else:
-        column_hint = ""
+    stream = await _get_async_client().chat.completions.create(
+        messages=_build_messages(image_bytes, mime_type, mode),
+        stream=True,
+        **_COMPLETION_OPTIONS,
+    )
+    reply = _ReplyBuffer()
+    try:
+        async for chunk in stream:
+            if reply.feed(chunk):
+                break
+    finally:
+        await stream.close()
 
-    prompt = f"""You are a precise data-extraction assistant.
+    data = _parse_reply(reply.text())
+    _cache_put(key, data)
+    return data
 
-Look at this image. It should contain a data table (handwritten or printed).
 
-{column_hint}
+async def extract_tables_batch(
+    items: list[tuple[bytes, str, str]], max_concurrency: int = 8
+) -> list[dict | BaseException]:
+    """
+    Extract several (image_bytes, mime_type, mode) items concurrently.
 
-Your task:
-1. Identify every column header and every row of numeric data in the table.
-2. Return ONLY valid JSON in this exact format (no markdown, no explanation):
+    At most max_concurrency API calls are in flight at once. Results come back in input order; a failed item is returned as its
+    exception instead of failing the batch.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-{{"columns": ["column_name_1", "column_name_2"], "rows": [[number, number], [number, number], ...]}}
+    async def one(item: tuple[bytes, str, str]) -> dict:
+        async with semaphore:
+            return await extract_table_from_image_async(*item)
 
-Rules:
-- Every value in "rows" must be a number (int or float), not a string.
-- If a value looks like scientific notation (e.g. 2.5×10⁻³), convert it to a decimal (0.0025).
-- Preserve the order of rows as they appear in the table.
-- If you cannot find a data table in the image, return exactly: {{"error": "No data table found"}}
-"""
+    return await asyncio.gather(*(one(item) for item in items), return_exceptions=True)
+
+
+class _ReplyBuffer:
+    """
+    Collect a streamed completion and spot the error reply early.
+
+    The reply is parsed as a whole once complete, but when it opens with
+    {"error" there is no table coming, so reading stops at the first "}"
+    and the stream is closed instead of waiting out the completion.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._is_error: bool | None = None  # None until the head is known
+
+    def feed(self, chunk) -> bool:
+        """Add one stream chunk; return True once the rest can be skipped."""
+        if not chunk.choices:
+            return False
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return False
+        self._parts.append(delta)
+
+        if self._is_error is None:
+            head = "".join(self._parts).lstrip()
+            if head.startswith(_FENCE):
+                head = head.removeprefix(_FENCE).removeprefix("json").lstrip()
+            if len(head) >= 12:
+                self._is_error = (
+                    head.startswith("{") and head[1:].lstrip().startswith('"error"')
+                )
+        return bool(self._is_error) and "}" in delta
+
+    def text(self) -> str | None:
+        return "".join(self._parts) if self._parts else None
+
+
+def _cache_key(image_bytes: bytes, mime_type: str, mode: str) -> tuple[bytes, str, str]:
+    return hashlib.blake2b(image_bytes, digest_size=16).digest(), mime_type, mode
+
+
+def _cache_get(key: tuple[bytes, str, str]) -> dict | None:
+    """Return a copy of the cached result for key, or None on a miss."""
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is None:
+            return None
+        _result_cache.move_to_end(key)
+    return copy.deepcopy(cached)
+
+
+def _cache_put(key: tuple[bytes, str, str], data: dict) -> None:
+    with _result_cache_lock:
+        _result_cache[key] = copy.deepcopy(data)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _build_messages(image_bytes: bytes, mime_type: str, mode: str) -> list[dict]:
+    """Build the chat messages: the mode's prompt plus the image."""
+    column_hint = _COLUMN_HINTS.get(mode, "")
+
+    prompt = _PROMPT_TEMPLATE.format(column_hint=column_hint)
 
     # Encode image as base64 data URL for the vision API
-    b64_image = base64.b64encode(image_bytes).decode("utf-8")
-    image_url = f"data:{mime_type};base64,{b64_image}"
-
-    response = client.chat.completions.create(
-        model="meta-llama/llama-4-scout-17b-16e-instruct",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": image_url},
-                    },
-                ],
-            }
-        ],
-        temperature=0.1,
-        max_completion_tokens=2048,
-    )
+    # (assembled as bytes and decoded once, so the encoded image is not
+    # copied into an intermediate str; pybase64 encodes with SIMD)
+    image_url = (
+        b"data:" + mime_type.encode("ascii") + b";base64," + pybase64.b64encode(image_bytes)
+    ).decode("ascii")
 
-    content = response.choices[0].message.content
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "image_url",
+                    "image_url": {"url": image_url},
+                },
+            ],
+        }
+    ]
+
+
+def _parse_reply(content: str | None) -> dict:
+    """Parse and validate the model's JSON reply into columns and rows."""
     if content is None:
         raise ValueError("Vision model returned an empty response.")
     raw_text = content.strip()
 
     # Strip markdown code fences if present
-    if raw_text.startswith("```"):
-        raw_text = re.sub(r"^```(?:json)?\s*", "", raw_text)
-        raw_text = re.sub(r"\s*```$", "", raw_text)
+    if raw_text.startswith(_FENCE):
+        raw_text = raw_text.removeprefix(_FENCE).removeprefix("json").lstrip()
+        raw_text = raw_text.removesuffix(_FENCE).rstrip()
 
     try:
-        data = json.loads(raw_text)
-    except json.JSONDecodeError:
+        data = orjson.loads(raw_text)
+    except orjson.JSONDecodeError:
         raise ValueError(
             f"Vision model returned invalid JSON. Raw response:\n{raw_text}"
         )
@@ -184,9 +333,18 @@ Rules:
     if not isinstance(data["rows"], list) or len(data["rows"]) == 0:
         raise ValueError("No data rows found in the table.")
 
-    # Coerce all values to float
+    try:
+        data["rows"] = _ROWS_ADAPTER.validate_python(data["rows"])
+    except ValidationError:
+        # Some cell isn't a number — keep the rest, blanking just those cells
+        data["rows"] = _coerce_rows(data["rows"])
+    return data
+
+
+def _coerce_rows(rows: list) -> list[list[float | None]]:
+    """Coerce every cell to float, replacing unparseable cells with None."""
     cleaned_rows = []
-    for row in data["rows"]:
+    for row in rows:
         cleaned_row = []
         for val in row:
             try:
@@ -194,6 +352,4 @@ Rules:
             except (ValueError, TypeError):
                 cleaned_row.append(None)
         cleaned_rows.append(cleaned_row)
-
-    data["rows"] = cleaned_rows
-    return data
+    return cleaned_rows
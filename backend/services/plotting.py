@@ -1,14 +1,35 @@
 """
-Graph generation service — produces a clean matplotlib plot as a base64 PNG.
+Graph generation service — produces a clean matplotlib plot as PNG (or
+WebP / SVG) bytes or a base64 data URL.
 """
 
-import base64
+import hashlib
 import io
+import queue
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
 import matplotlib
 matplotlib.use("Agg")  # non-interactive backend
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
 import numpy as np
+import orjson
+import pybase64
+
+# House style shared by every mode. Set once here rather than per plot:
+# cla() re-applies the grid defaults, and the face colours and spine
+# visibility persist on the pooled figures.
+matplotlib.rcParams.update({
+    "figure.facecolor": "white",
+    "axes.facecolor": "white",
+    "axes.grid": True,
+    "grid.alpha": 0.3,
+    "axes.spines.top": False,
+    "axes.spines.right": False,
+})
 
 # Colour palette & marker set for multi-series plots
 SERIES_COLORS = [
@@ -17,25 +38,225 @@ SERIES_COLORS = [
 ]
 SERIES_MARKERS = ["o", "s", "^", "D", "v", "p", "h", "*"]
 
+# Annotation box styles (Text.set_bbox copies the dict, so these can be shared)
+BOX_BLUE = dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd")
+BOX_GREEN = dict(boxstyle="round,pad=0.4", facecolor="#f0fdf4", edgecolor="#86efac")
+BOX_YELLOW = dict(boxstyle="round,pad=0.4", facecolor="#fef3c7", edgecolor="#fbbf24")
+
+# A fitted straight line is exact with just its two endpoints — sampling it
+# more densely only adds path vertices for Agg to transform and rasterize.
+LINEAR_FIT_SAMPLES = 2
+
+# 7×5 in at 100 dpi = 700×500 px, which is larger than the graph is ever
+# displayed, so a higher dpi only adds rasterization and PNG-encoding work.
+GRAPH_DPI = 100
+FIGSIZE = (7, 5)
+
+# Smooth (non-linear, monotonic) fit curves get one sample per ~4 px of
+# figure width — denser than that is indistinguishable once rasterized.
+CURVE_SAMPLES = max(64, min(300, int(FIGSIZE[0] * GRAPH_DPI / 4)))
+
+# Output image formats → media type. Lossless WebP comes out well under half
+# the size of the equivalent PNG for these flat-colour plots.
+# PNG uses zlib level 1: DEFLATE is most of the encode time, and level 1
+# costs only ~10-15% in size. SVG skips rasterization altogether, and with
+# at most a few hundred vertices per plot it is small as well.
+IMAGE_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "svg": "image/svg+xml"}
+_DATA_URL_PREFIXES = {
+    fmt: f"data:{media_type};base64,".encode("ascii")
+    for fmt, media_type in IMAGE_MEDIA_TYPES.items()
+}
+# savefig options per format. bbox_inches="tight" grows or trims the canvas
+# to the drawn artists, so a long title or wide tick labels are never cut
+# off. Leaving out the SVG date keeps the output (and the render cache)
+# deterministic.
+_SAVE_OPTIONS = {
+    "png": {"pil_kwargs": {"compress_level": 1}},
+    "webp": {"pil_kwargs": {"lossless": True, "method": 4}},
+    "svg": {"metadata": {"Date": None}},
+}
+
+# Pool of idle Figure + Axes pairs. Building a Figure is a large share of
+# per-plot cost, and pyplot's global figure registry is not thread-safe, so
+# figures are created directly (no pyplot) and cleared between requests
+# instead of being closed. The pool only grows to the peak number of
+# concurrent renders, and LIFO order hands out the most recently used
+# (cache-warm) figure first.
+_figure_pool: "queue.LifoQueue[tuple[Figure, matplotlib.axes.Axes]]" = queue.LifoQueue()
+
+
+# Recently rendered images, keyed on a digest of everything that determines
+# the plot. Callers outside the /api/fit result cache (e.g. /api/fit-waves
+# re-submitting the same tables) skip matplotlib entirely on a hit.
+_RENDER_CACHE_SIZE = 128
+_render_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _render_key(
+    arr: np.ndarray,
+    fit_params: dict,
+    mode: str,
+    columns: list[str] | None,
+    image_format: str,
+) -> bytes | None:
+    """Digest of the render inputs, or None if fit_params can't be serialised."""
+    try:
+        params = orjson.dumps(
+            fit_params, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        labels = orjson.dumps(columns)
+    except TypeError:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for part in (
+        mode.encode(), image_format.encode(), repr(arr.shape).encode(),
+        arr.tobytes(), params, labels,
+    ):
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.digest()
+
+
+def _acquire_figure() -> tuple[Figure, "matplotlib.axes.Axes"]:
+    """Take an idle Figure and Axes from the pool, cleared for a new plot."""
+    try:
+        fig, ax = _figure_pool.get_nowait()
+    except queue.Empty:
+        fig = Figure(figsize=FIGSIZE, dpi=GRAPH_DPI)
+        FigureCanvasAgg(fig)
+        # Titles and tick labels vary in width per mode and data, so lay the
+        # axes out again on every draw rather than with fixed margins
+        fig.set_layout_engine("constrained")
+        ax = fig.add_subplot()
+    else:
+        ax.cla()
+    return fig, ax
+
+
+@lru_cache(maxsize=64)
+def _smooth_grid(lo: float, hi: float, n: int) -> np.ndarray:
+    """
+    Evenly spaced sample points for drawing a fit curve over [lo, hi].
+
+    Memoised because the same table is often re-plotted (another format,
+    a /api/fit-waves retry). The array is read-only since it is shared.
+    """
+    grid = np.linspace(lo, hi, n)
+    grid.flags.writeable = False
+    return grid
+
+
+def _plot_series(
+    ax: "matplotlib.axes.Axes",
+    x: np.ndarray,
+    y: np.ndarray,
+    color: str,
+    marker: str,
+    label: str,
+) -> None:
+    """
+    Draw one measured series as a connected line with markers.
+
+    A single Line2D replaces the former scatter + plot pair. The line gets
+    the old 0.7 alpha through its RGBA colour, so the markers (size 40 pt²,
+    white edges) stay opaque as the scatter drew them.
+    """
+    ax.plot(x, y, color=to_rgba(color, 0.7), linewidth=1.5,
+            marker=marker, markersize=np.sqrt(40), markerfacecolor=color,
+            markeredgecolor="white", markeredgewidth=0.5, zorder=5, label=label)
+
+
+def _sorted_by_x(table: np.ndarray) -> np.ndarray:
+    """
+    Return the rows of table stably sorted by the first column.
+
+    The copy is column-major, so every arr[:, j] handed to matplotlib is a
+    contiguous view rather than a strided one it would copy again.
+    """
+    out = np.empty(table.shape, order="F")
+    np.take(table, table[:, 0].argsort(kind="stable"), axis=0, out=out)
+    return out
+
+
+def image_data_url(image: bytes, image_format: str = "png") -> str:
+    """Wrap raw image bytes in a base64 data URL for embedding in JSON."""
+    # Assembled as bytes and decoded once, so the encoded image is not also
+    # copied into an intermediate str; pybase64 encodes with SIMD
+    return (_DATA_URL_PREFIXES[image_format] + pybase64.b64encode(image)).decode("ascii")
+
 
 def generate_graph(
     points: list[list[float]],
     fit_params: dict,
     mode: str,
     columns: list[str] | None = None,
+    image_format: str = "png",
 ) -> str:
     """
     Create a publication-style plot for any fitting mode.
 
-    Returns a base64-encoded PNG data URL string.
+    Returns a base64-encoded PNG (or WebP / SVG) data URL string.
     """
-    arr = np.array(points, dtype=float)
-    arr = arr[arr[:, 0].argsort()]
-    x = arr[:, 0]
+    return image_data_url(
+        render_graph(points, fit_params, mode, columns, image_format), image_format
+    )
+
 
-    fig, ax = plt.subplots(figsize=(7, 5))
-    fig.patch.set_facecolor("white")
-    ax.set_facecolor("white")
+def render_graph(
+    points: list[list[float]],
+    fit_params: dict,
+    mode: str,
+    columns: list[str] | None = None,
+    image_format: str = "png",
+    cache: bool = True,
+) -> bytes:
+    """
+    Create a publication-style plot for any fitting mode.
+
+    Returns the raw image bytes in image_format ("png", "webp" or "svg"). Identical
+    inputs are answered from an in-process LRU cache, unless cache is False
+    because the caller caches the result itself.
+    """
+    # The routes and the process pool pass float64 arrays, which this keeps
+    # as-is; only a list of rows (or a strided view) is converted / copied
+    arr = np.ascontiguousarray(points, dtype=np.float64)
+    key = _render_key(arr, fit_params, mode, columns, image_format) if cache else None
+    if key is not None:
+        with _render_cache_lock:
+            image = _render_cache.get(key)
+            if image is not None:
+                _render_cache.move_to_end(key)
+                return image
+
+    fig, ax = _acquire_figure()
+    try:
+        image = _draw_graph(fig, ax, arr, fit_params, mode, columns, image_format)
+    finally:
+        _figure_pool.put((fig, ax))
+
+    if key is not None:
+        with _render_cache_lock:
+            _render_cache[key] = image
+            while len(_render_cache) > _RENDER_CACHE_SIZE:
+                _render_cache.popitem(last=False)
+    return image
+
+
+def _draw_graph(
+    fig: Figure,
+    ax: "matplotlib.axes.Axes",
+    table: np.ndarray,
+    fit_params: dict,
+    mode: str,
+    columns: list[str] | None,
+    image_format: str,
+) -> bytes:
+    """Draw the plot for mode onto fig / ax and return it as image bytes."""
+    # Sorted, so x[0] / x[-1] (and those of any ordered subset of x) are the
+    # data range without a min / max scan
+    arr = _sorted_by_x(table)
+    x = arr[:, 0]
 
     # ── Straight Line ────────────────────────────────────────────────
     if mode == "straight-line":
@@ -43,7 +264,7 @@ def generate_graph(
         ax.scatter(x, y, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data Points", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(x.min(), x.max(), 300)
+        x_smooth = _smooth_grid(x[0], x[-1], LINEAR_FIT_SAMPLES)
         m = fit_params["m"]
         c = fit_params["c"]
         y_fit = m * x_smooth + c
@@ -58,7 +279,7 @@ def generate_graph(
             0.05, 0.95,
             f"{fit_params['equation']}\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=10, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+            bbox=BOX_BLUE,
         )
 
     # ── CMC ──────────────────────────────────────────────────────────
@@ -67,22 +288,29 @@ def generate_graph(
         ax.scatter(x, y, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data Points", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(x.min(), x.max(), 300)
+        x_smooth = _smooth_grid(x[0], x[-1], CURVE_SAMPLES)
         cmc_x = fit_params["cmc_value"]
         cmc_y = fit_params["cmc_surface_tension"]
         a = fit_params["a"]
         b = fit_params["b"]
         c = fit_params["c"]
 
-        x_left = x_smooth[x_smooth <= cmc_x]
+        # x_smooth is sorted, so both sides of the breakpoint are slices
+        # (views, no boolean-mask copies); a sample exactly at cmc_x is in both
+        x_left = x_smooth[:np.searchsorted(x_smooth, cmc_x, side="right")]
         if len(x_left) > 0:
-            y_left = a + b * np.log(1.0 + c * np.clip(x_left, 0, None))
+            y_left = np.maximum(x_left, 0.0)
+            y_left *= c
+            np.log1p(y_left, out=y_left)
+            y_left *= b
+            y_left += a
             ax.plot(x_left, y_left, color=SERIES_COLORS[1], linewidth=2, label="Pre-CMC curve")
 
-        x_right = x_smooth[x_smooth >= cmc_x]
+        # The plateau is flat: one horizontal segment across its sample range
+        x_right = x_smooth[np.searchsorted(x_smooth, cmc_x, side="left"):]
         if len(x_right) > 0:
-            y_right = np.full_like(x_right, cmc_y)
-            ax.plot(x_right, y_right, color=SERIES_COLORS[2], linewidth=2, label="Post-CMC plateau")
+            ax.hlines(cmc_y, x_right[0], x_right[-1], color=SERIES_COLORS[2],
+                      linewidth=2, label="Post-CMC plateau")
 
         ax.axvline(x=cmc_x, color="#9333ea", linestyle="--", linewidth=1.5, alpha=0.7)
         ax.scatter([cmc_x], [cmc_y], color="#9333ea", s=100, zorder=6, marker="D",
@@ -96,7 +324,7 @@ def generate_graph(
             0.05, 0.95,
             f"CMC ≈ {cmc_x:.4g}\nSurface Tension at CMC ≈ {cmc_y:.4g}",
             transform=ax.transAxes, fontsize=10, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#f0fdf4", edgecolor="#86efac"),
+            bbox=BOX_GREEN,
         )
 
     # ── Photoelectric 1.1 / 1.3 — multi-series V-I curves ───────────
@@ -112,9 +340,7 @@ def generate_graph(
             mkr = SERIES_MARKERS[i % len(SERIES_MARKERS)]
             label = series_labels[i]
 
-            ax.scatter(x, y_s, color=clr, s=40, marker=mkr, zorder=5,
-                       edgecolors="white", linewidths=0.5)
-            ax.plot(x, y_s, color=clr, linewidth=1.5, alpha=0.7, label=label)
+            _plot_series(ax, x, y_s, clr, mkr, label)
 
             if label in stopping_pots:
                 v_stop = stopping_pots[label]
@@ -139,7 +365,7 @@ def generate_graph(
             ax.text(
                 0.02, 0.98, sp_text,
                 transform=ax.transAxes, fontsize=8, verticalalignment="top",
-                bbox=dict(boxstyle="round,pad=0.4", facecolor="#fef3c7", edgecolor="#fbbf24"),
+                bbox=BOX_YELLOW,
             )
 
     # ── Photoelectric 1.2 — V_stop vs ν (linear, find h) ────────────
@@ -148,7 +374,7 @@ def generate_graph(
         ax.scatter(x, y, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data Points", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(x.min(), x.max(), 300)
+        x_smooth = _smooth_grid(x[0], x[-1], LINEAR_FIT_SAMPLES)
         m = fit_params["m"]
         c_val = fit_params["c"]
         y_fit = m * x_smooth + c_val
@@ -164,7 +390,7 @@ def generate_graph(
             f"{fit_params['equation']}\nSlope = h/e = {m:.6g}\n"
             f"h ≈ {h_calc:.4e} J·s\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=9, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+            bbox=BOX_BLUE,
         )
 
     # ── Single Slit Diffraction ──────────────────────────────────────
@@ -177,9 +403,12 @@ def generate_graph(
         alpha = fit_params["alpha"]
         theta0 = fit_params["theta0"]
 
-        x_smooth = np.linspace(x.min(), x.max(), 500)
-        beta = alpha * (x_smooth - theta0)
-        y_fit = np.where(np.abs(beta) < 1e-10, I0, I0 * (np.sin(beta) / beta) ** 2)
+        x_smooth = _smooth_grid(x[0], x[-1], 500)
+        # np.sinc(u) = sin(πu)/(πu) with the u = 0 limit handled inside NumPy,
+        # so (sin β / β)² needs no np.where patch evaluating both branches
+        y_fit = np.sinc((alpha / np.pi) * (x_smooth - theta0))
+        y_fit *= y_fit
+        y_fit *= I0
         ax.plot(x_smooth, y_fit, color=SERIES_COLORS[1], linewidth=2, label="sinc² fit")
 
         # Mark central maximum
@@ -195,15 +424,14 @@ def generate_graph(
             0.02, 0.95,
             f"I₀ = {I0:.4f}\nθ₀ = {theta0:.4f}\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=9, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#fef3c7", edgecolor="#fbbf24"),
+            bbox=BOX_YELLOW,
         )
 
     # ── Newton's Rings — D² vs n ─────────────────────────────────────
     elif mode == "newtons-rings":
         transformed = fit_params.get("transformed_points")
         if transformed:
-            t_arr = np.array(transformed, dtype=float)
-            t_arr = t_arr[t_arr[:, 0].argsort()]
+            t_arr = _sorted_by_x(np.array(transformed, dtype=float))
             xp, yp = t_arr[:, 0], t_arr[:, 1]
         else:
             xp, yp = x, arr[:, 1] ** 2
@@ -211,7 +439,7 @@ def generate_graph(
         ax.scatter(xp, yp, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data (D² vs n)", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(xp.min(), xp.max(), 300)
+        x_smooth = _smooth_grid(xp[0], xp[-1], LINEAR_FIT_SAMPLES)
         m = fit_params["m"]
         c_val = fit_params["c"]
         y_fit = m * x_smooth + c_val
@@ -226,7 +454,7 @@ def generate_graph(
             0.05, 0.95,
             f"{fit_params['equation']}\nSlope = 4Rλ = {m:.4f}\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=10, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+            bbox=BOX_BLUE,
         )
 
     # ── Pohl's Pendulum — Damped Oscillation ─────────────────────────
@@ -243,19 +471,21 @@ def generate_graph(
             clr = SERIES_COLORS[i % len(SERIES_COLORS)]
             mkr = SERIES_MARKERS[i % len(SERIES_MARKERS)]
 
-            mask = phi > 0
-            if mask.sum() < 2:
+            # ln φ needs φ > 0; the kept indices stay in t order
+            valid = np.flatnonzero(phi > 0)
+            if valid.size < 2:
                 continue
 
-            ln_phi = np.log(phi[mask])
-            t_valid = t[mask]
+            t_valid = t.take(valid)
+            ln_phi = phi.take(valid)
+            np.log(ln_phi, out=ln_phi)
 
             ax.scatter(t_valid, ln_phi, color=clr, s=40, marker=mkr, zorder=5,
                        edgecolors="white", linewidths=0.5, label=label)
 
             if label in series_fits:
                 sf = series_fits[label]
-                t_line = np.linspace(t_valid.min(), t_valid.max(), 100)
+                t_line = _smooth_grid(t_valid[0], t_valid[-1], LINEAR_FIT_SAMPLES)
                 ax.plot(t_line, sf["slope"] * t_line + sf["intercept"],
                         color=clr, linewidth=1.5, alpha=0.8)
 
@@ -271,7 +501,7 @@ def generate_graph(
             ax.text(
                 0.02, 0.98, "\n".join(annot),
                 transform=ax.transAxes, fontsize=8, verticalalignment="top",
-                bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+                bbox=BOX_BLUE,
             )
 
     # ── Pohl's Pendulum — Forced Oscillation ─────────────────────────
@@ -288,9 +518,7 @@ def generate_graph(
             clr = SERIES_COLORS[i % len(SERIES_COLORS)]
             mkr = SERIES_MARKERS[i % len(SERIES_MARKERS)]
 
-            ax.scatter(freq, amp, color=clr, s=40, marker=mkr, zorder=5,
-                       edgecolors="white", linewidths=0.5)
-            ax.plot(freq, amp, color=clr, linewidth=1.5, alpha=0.7, label=label)
+            _plot_series(ax, freq, amp, clr, mkr, label)
 
             if label in resonances:
                 res = resonances[label]
@@ -310,7 +538,7 @@ def generate_graph(
             ax.text(
                 0.02, 0.98, "\n".join(annot),
                 transform=ax.transAxes, fontsize=8, verticalalignment="top",
-                bbox=dict(boxstyle="round,pad=0.4", facecolor="#f0fdf4", edgecolor="#86efac"),
+                bbox=BOX_GREEN,
             )
 
     # ── Polarization / Optical Rotation ──────────────────────────────
@@ -319,7 +547,7 @@ def generate_graph(
         ax.scatter(x, y, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data Points", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(x.min(), x.max(), 300)
+        x_smooth = _smooth_grid(x[0], x[-1], LINEAR_FIT_SAMPLES)
         m = fit_params["m"]
         c_val = fit_params["c"]
         y_fit = m * x_smooth + c_val
@@ -334,7 +562,7 @@ def generate_graph(
             0.05, 0.95,
             f"{fit_params['equation']}\nSlope = [α]·l = {m:.4f}\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=10, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#fef3c7", edgecolor="#fbbf24"),
+            bbox=BOX_YELLOW,
         )
 
     # ── Waves — Rope (λ vs 1/ν, 3 lines per tension group) ─────────
@@ -342,13 +570,13 @@ def generate_graph(
         series_fits = fit_params.get("series_fits", {})
         series_labels = fit_params.get("series_labels", [])
 
-        # Group the raw data points by group column (col 0)
-        group_ids = np.unique(arr[:, 0])
+        # Group the raw data points by group column (col 0). arr is already
+        # sorted on it, so each group is a contiguous run of rows.
+        group_starts = np.flatnonzero(np.diff(arr[:, 0]) != 0) + 1
 
-        for idx, g in enumerate(sorted(group_ids)):
-            mask = arr[:, 0] == g
-            inv_nu = arr[mask, 1]
-            lam = arr[mask, 2]
+        for idx, group in enumerate(np.split(arr, group_starts)):
+            inv_nu = group[:, 1]
+            lam = group[:, 2]
 
             label = series_labels[idx] if idx < len(series_labels) else f"T{idx+1}"
             clr = SERIES_COLORS[idx % len(SERIES_COLORS)]
@@ -359,7 +587,7 @@ def generate_graph(
 
             if label in series_fits:
                 sf = series_fits[label]
-                x_line = np.linspace(inv_nu.min(), inv_nu.max(), 100)
+                x_line = _smooth_grid(inv_nu.min(), inv_nu.max(), LINEAR_FIT_SAMPLES)
                 y_line = sf["slope"] * x_line + sf["intercept"]
                 vel = sf["phase_velocity"]
                 ax.plot(x_line, y_line, color=clr, linewidth=2, alpha=0.8,
@@ -377,15 +605,14 @@ def generate_graph(
             ax.text(
                 0.02, 0.98, "\n".join(annot),
                 transform=ax.transAxes, fontsize=8, verticalalignment="top",
-                bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+                bbox=BOX_BLUE,
             )
 
     # ── Waves — Sound (λ vs 1/ν, single line) ────────────────────────
     elif mode == "waves-sound":
         transformed = fit_params.get("transformed_points")
         if transformed:
-            t_arr = np.array(transformed, dtype=float)
-            t_arr = t_arr[t_arr[:, 0].argsort()]
+            t_arr = _sorted_by_x(np.array(transformed, dtype=float))
             xp, yp = t_arr[:, 0], t_arr[:, 1]
         else:
             freq = arr[:, 0]
@@ -396,7 +623,7 @@ def generate_graph(
         ax.scatter(xp, yp, color=SERIES_COLORS[0], s=60, zorder=5,
                    label="Data Points", edgecolors="white", linewidths=0.5)
 
-        x_smooth = np.linspace(xp.min(), xp.max(), 300)
+        x_smooth = _smooth_grid(xp.min(), xp.max(), LINEAR_FIT_SAMPLES)
         m = fit_params["m"]
         c_val = fit_params["c"]
         y_fit = m * x_smooth + c_val
@@ -412,20 +639,20 @@ def generate_graph(
             0.05, 0.95,
             f"{fit_params['equation']}\nSpeed of sound = {velocity:.2f} m/s\nR² = {fit_params['r_squared']:.6f}",
             transform=ax.transAxes, fontsize=10, verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.4", facecolor="#eff6ff", edgecolor="#93c5fd"),
+            bbox=BOX_BLUE,
         )
 
     # ── Common finishing ─────────────────────────────────────────────
     ax.legend(fontsize=9, loc="best")
-    ax.grid(True, alpha=0.3)
-    ax.spines["top"].set_visible(False)
-    ax.spines["right"].set_visible(False)
-    plt.tight_layout()
 
-    # Save to base64
+    # Save to image bytes
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode("utf-8")
-    return f"data:image/png;base64,{b64}"
+    fig.savefig(
+        buf,
+        format=image_format,
+        dpi=GRAPH_DPI,
+        bbox_inches="tight",
+        **_SAVE_OPTIONS[image_format],
+    )
+    # getvalue() hands over BytesIO's buffer without the copy seek + read makes
+    return buf.getvalue()
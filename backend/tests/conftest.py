@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend imports its packages as top-level modules (routes, services)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty fit, render and OCR caches."""
+    from routes.fit import _cached_fit_and_plot
+    from services import ocr, plotting
+
+    _cached_fit_and_plot.cache_clear()
+    plotting._render_cache.clear()
+    ocr._result_cache.clear()
+    yield
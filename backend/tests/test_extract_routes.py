@@ -0,0 +1,166 @@
+"""Tests for /api/extract, /api/extract/batch and the OCR result cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from routes.extract import MAX_UPLOAD_BYTES
+from services import ocr
+
+TABLE_REPLY = '```json\n{"columns": ["X", "Y"], "rows": [[1, 2], [3, "n/a"]]}\n```'
+ERROR_REPLY = '{"error": "No table found in the image."}'
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _FakeStream:
+    def __init__(self, text):
+        self._chunks = [_chunk(text[i:i + 8]) for i in range(0, len(text), 8)]
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def close(self):
+        pass
+
+
+class _FakeAsyncGroq:
+    """Answers each image with the reply registered for its bytes."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, messages, stream, **options):
+        self.calls += 1
+        image_url = messages[0]["content"][1]["image_url"]["url"]
+        for marker, reply in self.replies.items():
+            if image_url.endswith(marker):
+                return _FakeStream(reply)
+        raise AssertionError("unexpected image")
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    import pybase64
+
+    fake = _FakeAsyncGroq({
+        pybase64.b64encode(b"table-image").decode(): TABLE_REPLY,
+        pybase64.b64encode(b"blank-image").decode(): ERROR_REPLY,
+    })
+    monkeypatch.setattr(ocr, "_get_async_client", lambda: fake)
+    return fake
+
+
+def _upload(name, data, content_type="image/png"):
+    return ("images", (name, data, content_type))
+
+
+def test_extract_parses_the_reply(client, groq):
+    response = client.post(
+        "/api/extract",
+        files={"image": ("a.png", b"table-image", "image/png")},
+        data={"mode": "straight-line"},
+    )
+
+    assert response.status_code == 200
+    # Unparseable cells become None instead of failing the table
+    assert response.json() == {"columns": ["X", "Y"], "rows": [[1.0, 2.0], [3.0, None]]}
+
+
+def test_extract_batch_reports_each_image(client, groq):
+    response = client.post(
+        "/api/extract/batch",
+        files=[
+            _upload("a.png", b"table-image"),
+            _upload("b.txt", b"hello", "text/plain"),
+            _upload("c.png", b""),
+            _upload("d.png", b"blank-image"),
+        ],
+        data={"mode": "straight-line"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"columns": ["X", "Y"], "rows": [[1.0, 2.0], [3.0, None]]},
+        {"error": "Uploaded file is not an image.", "status": 400},
+        {"error": "Uploaded file is empty.", "status": 400},
+        {"error": "No table found in the image.", "status": 422},
+    ]
+    # Only the two readable images reached the vision model
+    assert groq.calls == 2
+
+
+def test_ocr_results_are_cached(client, groq):
+    files = {"image": ("a.png", b"table-image", "image/png")}
+    first = client.post("/api/extract", files=files, data={"mode": "cmc"}).json()
+    second = client.post("/api/extract", files=files, data={"mode": "cmc"}).json()
+
+    assert first == second
+    assert groq.calls == 1
+
+    # The mode is part of the prompt, so it is part of the key
+    client.post("/api/extract", files=files, data={"mode": "straight-line"})
+    assert groq.calls == 2
+
+
+def test_cached_ocr_result_is_a_copy(groq):
+    import asyncio
+
+    first = asyncio.run(ocr.extract_table_from_image_async(b"table-image", "image/png", "cmc"))
+    first["rows"].clear()
+    second = asyncio.run(ocr.extract_table_from_image_async(b"table-image", "image/png", "cmc"))
+
+    assert second["rows"] == [[1.0, 2.0], [3.0, None]]
+
+
+def test_failed_ocr_is_not_cached(client, groq):
+    files = {"image": ("d.png", b"blank-image", "image/png")}
+    for _ in range(2):
+        response = client.post("/api/extract", files=files)
+        assert response.status_code == 422
+
+    assert groq.calls == 2
+
+
+def test_oversized_upload_is_rejected(client, groq):
+    response = client.post(
+        "/api/extract",
+        files={"image": ("a.png", b"x" * (MAX_UPLOAD_BYTES + 1), "image/png")},
+    )
+
+    assert response.status_code == 413
+    assert groq.calls == 0
+
+
+def test_oversized_streamed_body_is_rejected(client, groq):
+    # No Content-Length: the middleware counts the bytes as they arrive
+    def body():
+        for _ in range(MAX_UPLOAD_BYTES // 65536 + 2):
+            yield b"x" * 65536
+
+    response = client.post(
+        "/api/extract/batch",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_oversized_upload_keeps_cors_headers(client, groq):
+    response = client.post(
+        "/api/extract",
+        files={"image": ("a.png", b"x" * (MAX_UPLOAD_BYTES + 1), "image/png")},
+        headers={"Origin": "http://localhost:5173"},
+    )
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
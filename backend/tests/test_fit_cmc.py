@@ -0,0 +1,127 @@
+"""Regression tests for fit_cmc (grid search + two-stage least_squares)."""
+
+import numpy as np
+import pytest
+
+from services.fitting import fit_cmc
+
+PINNED_KEYS = ("cmc_value", "cmc_surface_tension", "a", "b", "c", "r_squared")
+
+
+def _szyszkowski(x, a, b, c, x0):
+    """Log curve up to x0, constant plateau after it."""
+    return a + b * np.log1p(c * np.minimum(x, x0))
+
+
+def _points(x, y):
+    return np.column_stack([x, y]).tolist()
+
+
+def _assert_fit(result, expected, rel):
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value, rel=rel), key
+
+
+# ── Noise-free data: the fit must recover the generating parameters ──
+
+@pytest.mark.parametrize(
+    "x, params",
+    [
+        # Break in the middle of an evenly spaced series
+        (np.linspace(0, 0.02, 16), (72.0, -8.0, 1500.0, 0.012)),
+        # Break early, so most candidates sit on the plateau
+        (np.linspace(0, 0.02, 12), (72.0, -8.0, 1500.0, 0.004)),
+        # Break late, leaving the minimum of two plateau points
+        (np.linspace(0, 0.02, 12), (72.0, -8.0, 1500.0, 0.0175)),
+        # The minimum of five points
+        (np.array([0, 0.002, 0.004, 0.008, 0.012]), (72.0, -8.0, 1500.0, 0.006)),
+    ],
+    ids=["mid-break", "early-break", "late-break", "five-points"],
+)
+def test_recovers_noise_free_model(x, params):
+    a, b, c, x0 = params
+    result = fit_cmc(_points(x, _szyszkowski(x, *params)))
+
+    _assert_fit(result, {"cmc_value": x0, "a": a, "b": b, "c": c}, rel=1e-5)
+    assert result["cmc_surface_tension"] == pytest.approx(
+        a + b * np.log1p(c * x0), rel=1e-6
+    )
+    assert result["r_squared"] == pytest.approx(1.0, abs=1e-9)
+
+
+# ── Noisy data: pin the current fit ──────────────────────────────────
+
+def test_pins_noisy_linear_series():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0.0005, 0.03, 20)
+    y = _szyszkowski(x, 71.5, -9.0, 800.0, 0.018) + rng.normal(0, 0.1, 20)
+
+    _assert_fit(fit_cmc(_points(x, y)), {
+        "cmc_value": 0.0180313493,
+        "cmc_surface_tension": 46.8415872,
+        "a": 71.4466028,
+        "b": -9.09055440,
+        "c": 775.267620,
+        "r_squared": 0.999828946,
+    }, rel=1e-4)
+
+
+def test_pins_noisy_log_spaced_series():
+    rng = np.random.default_rng(1)
+    x = np.geomspace(1e-4, 5e-2, 14)
+    y = _szyszkowski(x, 72.8, -12.0, 400.0, 0.01) + rng.normal(0, 0.05, 14)
+
+    _assert_fit(fit_cmc(_points(x, y)), {
+        "cmc_value": 0.0100341191,
+        "cmc_surface_tension": 53.4826922,
+        "a": 72.8146568,
+        "b": -11.9491845,
+        "c": 402.848310,
+        "r_squared": 0.999985373,
+    }, rel=1e-4)
+
+
+def test_unsorted_input_gives_the_same_fit():
+    x = np.linspace(0, 0.02, 16)
+    points = _points(x, _szyszkowski(x, 72.0, -8.0, 1500.0, 0.012))
+    shuffled = [points[i] for i in np.random.default_rng(2).permutation(len(points))]
+
+    expected = fit_cmc(points)
+    result = fit_cmc(shuffled)
+    for key in PINNED_KEYS:
+        assert result[key] == pytest.approx(expected[key], rel=1e-9), key
+
+
+# ── Plateau-pruning edge cases ───────────────────────────────────────
+
+def test_all_candidates_pruned_falls_back_to_full_grid():
+    # Rising tension: every right-segment mean is in the upper half of the
+    # y range, so the pruning keeps nothing and all candidates are scored
+    x = np.linspace(0, 0.02, 12)
+    result = fit_cmc(_points(x, _szyszkowski(x, 40.0, 8.0, 1500.0, 0.012)))
+
+    _assert_fit(result, {"cmc_value": 0.012, "a": 40.0, "b": 8.0, "c": 1500.0}, rel=1e-5)
+    assert result["r_squared"] == pytest.approx(1.0, abs=1e-9)
+
+
+def test_flat_data_keeps_the_plateau_level():
+    # No transition at all: the breakpoint is not identifiable, but the
+    # plateau must stay at the data level and R² must report the poor fit
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 0.02, 10)
+    result = fit_cmc(_points(x, 50.0 + rng.normal(0, 1e-3, 10)))
+
+    assert result["cmc_surface_tension"] == pytest.approx(50.0, abs=1e-3)
+    assert 0.0 <= result["cmc_value"] <= 0.02
+    assert result["r_squared"] < 0.01
+
+
+def test_no_plateau_raises():
+    x = np.linspace(0, 1, 8)
+    with pytest.raises(RuntimeError, match="CMC fitting failed"):
+        fit_cmc(_points(x, 30 + 5 * x))
+
+
+def test_needs_five_points():
+    with pytest.raises(ValueError, match="at least 5"):
+        fit_cmc([[0, 72], [0.001, 65], [0.002, 60], [0.003, 58]])
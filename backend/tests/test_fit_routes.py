@@ -0,0 +1,140 @@
+"""Tests for /api/fit/image, /api/fit/batch and the fit / render caches."""
+
+import pybase64
+
+from routes.fit import _cached_fit_and_plot, _fit_and_plot
+from services import plotting
+
+LINE = {"points": [[1, 2.1], [2, 3.9], [3, 6.2], [4, 7.8]], "columns": ["X", "Y"]}
+
+
+def test_fit_image_returns_raw_png(client):
+    response = client.post("/api/fit/image", json={"mode": "straight-line", **LINE})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def test_fit_image_formats(client):
+    webp = client.post(
+        "/api/fit/image", json={"mode": "straight-line", "image_format": "webp", **LINE}
+    )
+    svg = client.post(
+        "/api/fit/image", json={"mode": "straight-line", "image_format": "svg", **LINE}
+    )
+
+    assert webp.headers["content-type"] == "image/webp"
+    assert webp.content[:4] == b"RIFF" and webp.content[8:12] == b"WEBP"
+    assert svg.headers["content-type"].startswith("image/svg+xml")
+    assert b"<svg" in svg.content
+
+
+def test_fit_image_matches_fit_graph(client):
+    body = {"mode": "straight-line", **LINE}
+    image = client.post("/api/fit/image", json=body).content
+    data_url = client.post("/api/fit", json=body).json()["graphImage"]
+
+    assert data_url == "data:image/png;base64," + pybase64.b64encode(image).decode()
+
+
+def test_fit_image_rejects_bad_request(client):
+    response = client.post("/api/fit/image", json={"mode": "nope", **LINE})
+
+    assert response.status_code == 400
+    assert "Unknown fitting mode" in response.json()["detail"]
+
+
+def test_fit_batch_reports_each_mode(client):
+    response = client.post(
+        "/api/fit/batch",
+        json={"modes": ["straight-line", "cmc", "straight-line", "nope"], **LINE},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["points"] == LINE["points"]
+    # Duplicates are dropped, order is kept
+    assert list(body["results"]) == ["straight-line", "cmc", "nope"]
+
+    line = body["results"]["straight-line"]
+    assert line["graphImage"].startswith("data:image/png;base64,")
+    assert line["fitParams"]["m"] > 0
+    # Four points are too few for a CMC fit, and the mode is unknown:
+    # both fail on their own without failing the batch
+    assert body["results"]["cmc"]["status"] == 500
+    assert body["results"]["nope"] == {
+        "error": "Unknown fitting mode: 'nope'", "status": 400,
+    }
+
+
+def test_fit_batch_needs_a_mode(client):
+    response = client.post("/api/fit/batch", json={"modes": [], **LINE})
+
+    assert response.status_code == 400
+
+
+def test_fit_results_are_cached(client):
+    body = {"mode": "straight-line", **LINE}
+    first = client.post("/api/fit", json=body).json()
+    second = client.post("/api/fit", json=body).json()
+
+    info = _cached_fit_and_plot.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert first == second
+
+    # A different image format is a different entry
+    client.post("/api/fit", json={**body, "image_format": "svg"})
+    assert _cached_fit_and_plot.cache_info().misses == 2
+
+    # The graph is cached once, here, not again at render level
+    assert len(plotting._render_cache) == 0
+
+
+def test_cached_fit_params_are_copies():
+    import numpy as np
+
+    arr = np.asarray(LINE["points"], dtype=np.float64)
+    args = ("straight-line", arr.shape, arr.tobytes(), ("X", "Y"))
+    first, _ = _fit_and_plot(*args)
+    first["m"] = -1.0
+    second, _ = _fit_and_plot(*args)
+
+    assert second["m"] > 0
+    assert _cached_fit_and_plot.cache_info().hits == 1
+
+
+def test_render_cache_returns_the_same_image():
+    from services.fitting import fit_straight_line
+
+    points = LINE["points"]
+    fit_params = fit_straight_line(points)
+    first = plotting.render_graph(points, fit_params, "straight-line", ["X", "Y"])
+    assert len(plotting._render_cache) == 1
+
+    # An identical request is answered without drawing again
+    plotting._render_cache[next(iter(plotting._render_cache))] = b"cached"
+    assert plotting.render_graph(points, fit_params, "straight-line", ["X", "Y"]) == b"cached"
+
+    # Different columns miss the cache
+    other = plotting.render_graph(points, fit_params, "straight-line", ["T", "V"])
+    assert other != b"cached" and other.startswith(b"\x89PNG")
+    assert first.startswith(b"\x89PNG")
+    assert len(plotting._render_cache) == 2
+
+
+def test_fit_waves_renders_without_a_process_pool(client, monkeypatch):
+    from services import executor
+
+    monkeypatch.delenv("FIT_PROCESS_WORKERS", raising=False)
+    response = client.post("/api/fit-waves", json={
+        "rope_points": [[1, 0.01, 0.5], [1, 0.02, 1.0], [1, 0.03, 1.52], [2, 0.01, 0.4]],
+        "sound_points": [[300, 55], [400, 42], [500, 33]],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ropeGraphImage"].startswith("data:image/png;base64,")
+    assert body["soundGraphImage"].startswith("data:image/png;base64,")
+    # The default is in-thread: no worker processes were spawned
+    assert executor._pool is None
@@ -0,0 +1,18 @@
+"""Tests for the app-level response class."""
+
+import numpy as np
+import orjson
+
+from main import NumpyORJSONResponse
+
+
+def test_numpy_response_serializes_arrays():
+    response = NumpyORJSONResponse({"r_squared": np.float64(0.5), "x": np.arange(3)})
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"r_squared": 0.5, "x": [0, 1, 2]}
+
+
+def test_numpy_response_avoids_deprecated_orjson_response():
+    # FastAPI deprecates ORJSONResponse; the class must build on JSONResponse
+    assert "ORJSONResponse" not in {cls.__name__ for cls in NumpyORJSONResponse.__mro__}
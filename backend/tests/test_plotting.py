@@ -0,0 +1,12 @@
+"""Tests for services.plotting module-level settings."""
+
+import matplotlib
+
+from services import plotting  # noqa: F401  (applies the house style)
+
+
+def test_path_simplification_keeps_matplotlib_defaults():
+    # A higher threshold flattens measured peaks such as the Pohl resonance
+    # curves, so the module must not touch Matplotlib's path simplification
+    for key in ("path.simplify", "path.simplify_threshold"):
+        assert matplotlib.rcParams[key] == matplotlib.rcParamsDefault[key], key